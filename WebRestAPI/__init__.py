@@ -1,6 +1,7 @@
 from WebRestAPI.requests import HTTPRequest
-from WebRestAPI.response import HTTPResponse
+from WebRestAPI.response import HTTPResponse, StreamingResponse, EventSourceResponse, ServerSentEvent, FileStreamResponse
 from WebRestAPI.routes import Router
+from WebRestAPI.cache import CachePolicy
 from WebRestAPI.server import APIServer
 from WebRestAPI.configurate import APIConfiguration
 from WebRestAPI.log import APIlog , FuncLog
@@ -10,10 +11,11 @@ __version__ = "0.0.3"
 
 JSONResponse = HTTPResponse.JSONResponse
 HTMLResponse = HTTPResponse.HTMLResponse
+TemplateResponse = HTTPResponse.TemplateResponse
 
 __all__ = [
     #API
-    "APIServer","Router","APIConfiguration",
+    "APIServer","Router","APIConfiguration","CachePolicy",
 
     #variable
     "__version__",
@@ -22,7 +24,8 @@ __all__ = [
     "HTTPRequest",
 
     #Response
-    "HTTPResponse","JSONResponse","HTMLResponse",
+    "HTTPResponse","JSONResponse","HTMLResponse","TemplateResponse",
+    "StreamingResponse","EventSourceResponse","ServerSentEvent","FileStreamResponse",
 
     #log
     "APIlog","FuncLog",
@@ -0,0 +1,259 @@
+import asyncio
+import time
+import urllib.parse
+from typing import Dict, Optional
+
+from WebRestAPI.requests import HTTPRequest, RequestStream
+from WebRestAPI.response import HTTPResponse, StreamingResponse, FileStreamResponse
+from WebRestAPI.multipart import MultipartParser, parse_boundary
+from WebRestAPI.executors import pools
+from WebRestAPI.log.log import APIlog
+from WebRestAPI.exception_code import ClientDisconnectedError, HTTPParseError
+
+FILE_CHUNK_SIZE = 262144
+
+# the ASGI server owns the connection and its framing
+HOP_BY_HOP_HEADERS = frozenset(('connection', 'keep-alive', 'transfer-encoding', 'content-length'))
+
+
+def _header_list(headers: Dict[str, str], content_type: Optional[str] = None,
+                 content_length: Optional[int] = None) -> list[tuple[bytes, bytes]]:
+    items = [
+        (name.lower().encode('latin-1'), str(value).encode('utf-8'))
+        for name, value in headers.items() if name.lower() not in HOP_BY_HOP_HEADERS
+    ]
+    if content_type and 'Content-Type' not in headers:
+        items.append((b'content-type', content_type.encode('latin-1')))
+    if content_length is not None:
+        items.append((b'content-length', b'%d' % content_length))
+    return items
+
+
+class ASGIApp:
+    def __init__(self, server):
+        self._server = server
+        self._started = False
+
+    async def __call__(self, scope, receive, send):
+        kind = scope['type']
+        if kind == 'http':
+            self._startup()
+            await self._http(scope, receive, send)
+        elif kind == 'lifespan':
+            await self._lifespan(receive, send)
+        else:
+            raise RuntimeError(f"Unsupported ASGI scope type '{kind}'")
+
+    def _startup(self):
+        if self._started:
+            return
+        cfg = self._server.cfg
+        codec = self._server._prepare()
+        pools.configure(cfg.thread_pool_size, cfg.process_pool_size)
+        self._started = True
+        APIlog.debug(f"JSON codec: {codec.name}")
+
+    async def _lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                try:
+                    self._startup()
+                except Exception as e:
+                    await send({'type': 'lifespan.startup.failed', 'message': str(e)})
+                    return
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                pools.shutdown(wait=False)
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+    async def _http(self, scope, receive, send):
+        server = self._server
+        method = scope['method']
+        target = scope.get('raw_path')
+        target = target.decode('latin-1') if target else urllib.parse.quote(scope['path'])
+        if scope.get('query_string'):
+            target = f"{target}?{scope['query_string'].decode('latin-1')}"
+
+        headers = {}
+        for name, value in scope['headers']:
+            key = name.decode('latin-1').lower()
+            value = value.decode('utf-8', errors='ignore')
+            headers[key] = f"{headers[key]}, {value}" if key in headers else value
+        http_version = f"HTTP/{scope.get('http_version', '1.1')}"
+
+        reader = None
+        if server._is_streaming(method, target):
+            readable = asyncio.Event()
+            stream = RequestStream(timeout=server.cfg.client_timeout, on_read=readable.set)
+            request = HTTPRequest.from_parts(method, target, http_version, headers, stream=stream)
+            reader = asyncio.create_task(self._read_stream(receive, stream, readable))
+        else:
+            try:
+                request = await self._read_request(receive, method, target, http_version, headers)
+            except HTTPParseError as e:
+                await self._send(scope, send, HTTPResponse.PlainTextResponse(e.message, status_code=e.status_code))
+                return
+            except ClientDisconnectedError:
+                return
+
+        metrics = server.metrics
+        if metrics is not None:
+            metrics.in_flight += 1
+            started = time.perf_counter()
+        try:
+            response = await server._handle_request(request)
+            if metrics is not None:
+                responded = time.perf_counter()
+            await self._send(scope, send, response, request)
+            if metrics is not None:
+                finished = time.perf_counter()
+                metrics.observe(request.method, request.route, response.status_code,
+                                finished - started, responded - started, finished - responded)
+        finally:
+            if metrics is not None:
+                metrics.in_flight -= 1
+            request.close()
+            if reader is not None and not reader.done():
+                reader.cancel()
+
+    async def _read_request(self, receive, method: str, target: str, http_version: str,
+                            headers: Dict[str, str]) -> HTTPRequest:
+        cfg = self._server.cfg
+        multipart = None
+        content_type = headers.get('content-type', '')
+        if 'multipart/form-data' in content_type:
+            boundary = parse_boundary(content_type)
+            if boundary is not None:
+                multipart = MultipartParser(boundary, cfg.max_part_size, cfg.multipart_spool_size)
+
+        body = []
+        size = 0
+        try:
+            while True:
+                message = await receive()
+                if message['type'] == 'http.disconnect':
+                    raise ClientDisconnectedError()
+                chunk = message.get('body', b'')
+                if chunk:
+                    size += len(chunk)
+                    if cfg.max_body_size is not None and size > cfg.max_body_size:
+                        raise HTTPParseError("Payload Too Large", 413)
+                    if multipart is not None:
+                        multipart.feed(chunk)
+                    else:
+                        body.append(chunk)
+                if not message.get('more_body', False):
+                    break
+            if multipart is not None and size:
+                multipart.finish()
+        except Exception:
+            if multipart is not None:
+                multipart.close()
+            raise
+
+        request = HTTPRequest.from_parts(method, target, http_version, headers, b''.join(body))
+        if multipart is not None and size:
+            request.form_data = multipart.form
+            request.files = multipart.files
+        return request
+
+    async def _read_stream(self, receive, stream: RequestStream, readable: asyncio.Event):
+        limit = self._server.cfg.max_body_size
+        size = 0
+        while True:
+            while stream.full:
+                readable.clear()
+                await readable.wait()
+            message = await receive()
+            if message['type'] == 'http.disconnect':
+                stream.abort(ClientDisconnectedError())
+                return
+            chunk = message.get('body', b'')
+            size += len(chunk)
+            if limit is not None and size > limit:
+                stream.abort(HTTPParseError("Payload Too Large", 413))
+                return
+            stream.feed(chunk)
+            if not message.get('more_body', False):
+                stream.finish()
+                return
+
+    async def _send(self, scope, send, response: HTTPResponse, request: Optional[HTTPRequest] = None):
+        if isinstance(response, StreamingResponse):
+            await self._send_stream(send, response)
+        elif isinstance(response, FileStreamResponse):
+            await self._send_file(scope, send, response, request)
+        else:
+            body, default_type = response._encode_body()
+            await send({
+                'type': 'http.response.start',
+                'status': response.status_code,
+                'headers': _header_list(response.headers, default_type, len(body)),
+            })
+            await send({'type': 'http.response.body', 'body': body})
+
+    async def _send_stream(self, send, response: StreamingResponse):
+        await send({
+            'type': 'http.response.start',
+            'status': response.status_code,
+            'headers': _header_list(response.headers, 'application/octet-stream', response.content_length),
+        })
+        try:
+            async for chunk in response.iterate():
+                if chunk:
+                    await send({'type': 'http.response.body', 'body': bytes(chunk), 'more_body': True})
+        except (ConnectionError, asyncio.CancelledError):
+            raise
+        except Exception as e:
+            # re-raised so the server aborts the connection instead of ending the body cleanly
+            APIlog.error(f"Streaming response error: {e}")
+            raise
+        await send({'type': 'http.response.body', 'body': b''})
+
+    async def _send_file(self, scope, send, response: FileStreamResponse, request: Optional[HTTPRequest]):
+        try:
+            response.prepare(request)
+            file = open(response.path, 'rb') if response.count and response.content is None else None
+        except OSError as e:
+            APIlog.error(f"File response error: {e}")
+            not_found = HTTPResponse.HTMLResponse("<h1>404 Not Found</h1><p>File not found</p>", status_code=404)
+            await self._send(scope, send, not_found)
+            return
+
+        content_length = None if response.status_code == 304 else response.count
+        await send({
+            'type': 'http.response.start',
+            'status': response.status_code,
+            'headers': _header_list(response.headers, 'application/octet-stream', content_length),
+        })
+
+        if not response.count or (request is not None and request.method == 'HEAD'):
+            if file is not None:
+                file.close()
+            await send({'type': 'http.response.body', 'body': b''})
+            return
+
+        if file is None:
+            body = response.content[response.offset:response.offset + response.count]
+            await send({'type': 'http.response.body', 'body': body})
+            return
+
+        with file:
+            if (response.offset == 0 and response.count == response.stat.st_size
+                    and 'http.response.pathsend' in scope.get('extensions', {})):
+                await send({'type': 'http.response.pathsend', 'path': response.path})
+                return
+
+            loop = asyncio.get_running_loop()
+            await loop.run_in_executor(None, file.seek, response.offset)
+            remaining = response.count
+            while remaining:
+                chunk = await loop.run_in_executor(None, file.read, min(remaining, FILE_CHUNK_SIZE))
+                if not chunk:
+                    break
+                remaining -= len(chunk)
+                await send({'type': 'http.response.body', 'body': chunk, 'more_body': bool(remaining)})
+            if remaining:
+                raise OSError(f"File {response.path} was truncated while it was being sent")
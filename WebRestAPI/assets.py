@@ -0,0 +1,105 @@
+import hashlib
+import mimetypes
+import os
+import time
+from typing import Any, Dict, Optional
+
+from WebRestAPI import json_codec
+from WebRestAPI.response import PrebuiltResponse
+
+CHECK_INTERVAL = 1.0
+DEFAULT_CACHE_CONTROL = 'public, max-age=86400'
+
+
+class Asset:
+    def __init__(self, file: Optional[str] = None, content: Any = None, content_type: Optional[str] = None,
+                 cache_control: Optional[str] = DEFAULT_CACHE_CONTROL, status_code: int = 200):
+        self.file = file
+        self.content = content
+        self.content_type = content_type
+        self.cache_control = cache_control
+        self.status_code = status_code
+        self.etag = None
+        self.response = None
+        self.not_modified = None
+        self._mtime_ns = None
+        self._checked_at = 0.0
+
+    def load(self):
+        content = self.content
+        content_type = self.content_type
+
+        if self.file is not None:
+            try:
+                file_stat = os.stat(self.file)
+                with open(self.file, 'rb') as file:
+                    content = file.read()
+            except OSError:
+                if self.response is not None:
+                    return
+                content, file_stat = b'', None
+            self._mtime_ns = file_stat.st_mtime_ns if file_stat is not None else None
+            content_type = content_type or mimetypes.guess_type(self.file)[0] or 'application/octet-stream'
+        elif isinstance(content, str):
+            content = content.encode('utf-8')
+            content_type = content_type or 'text/plain; charset=utf-8'
+        elif not isinstance(content, bytes):
+            content = json_codec.dumps(content)
+            content_type = content_type or 'application/json'
+
+        self.etag = f'"{hashlib.blake2b(content, digest_size=8).hexdigest()}"'
+        headers = {'Content-Type': content_type or 'application/octet-stream', 'ETag': self.etag}
+        if self.cache_control:
+            headers['Cache-Control'] = self.cache_control
+
+        self.response = PrebuiltResponse(content, self.status_code, headers)
+        not_modified = {key: value for key, value in headers.items() if key != 'Content-Type'}
+        not_modified['Content-Length'] = str(len(content))
+        self.not_modified = PrebuiltResponse(b'', 304, not_modified)
+
+    def revalidate(self, now: float):
+        if self.file is None or now - self._checked_at < CHECK_INTERVAL:
+            return
+        self._checked_at = now
+        try:
+            mtime_ns = os.stat(self.file).st_mtime_ns
+        except OSError:
+            return
+        if mtime_ns != self._mtime_ns:
+            self.load()
+
+
+class AssetCache:
+    def __init__(self):
+        self._assets: Dict[str, Asset] = {}
+
+    def __len__(self):
+        return len(self._assets)
+
+    def __contains__(self, path: str) -> bool:
+        return path in self._assets
+
+    def register(self, path: str, file: Optional[str] = None, content: Any = None,
+                 content_type: Optional[str] = None, cache_control: Optional[str] = DEFAULT_CACHE_CONTROL,
+                 status_code: int = 200) -> Asset:
+        if file is None and content is None:
+            raise ValueError(f"Asset {path} needs a file or content.")
+        asset = Asset(file, content, content_type, cache_control, status_code)
+        asset.load()
+        self._assets[path] = asset
+        return asset
+
+    def unregister(self, path: str):
+        self._assets.pop(path, None)
+
+    def get(self, path: str, headers: Dict[str, str] = None) -> Optional[PrebuiltResponse]:
+        asset = self._assets.get(path)
+        if asset is None:
+            return None
+
+        asset.revalidate(time.monotonic())
+        if headers:
+            if_none_match = headers.get('if-none-match')
+            if if_none_match and asset.etag in (tag.strip().removeprefix('W/') for tag in if_none_match.split(',')):
+                return asset.not_modified
+        return asset.response
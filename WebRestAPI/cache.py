@@ -0,0 +1,125 @@
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional
+
+from WebRestAPI.response import HTTPResponse, PrebuiltResponse, StreamingResponse, FileStreamResponse
+
+
+def default_cache_key(request) -> Hashable:
+    return request.method, request.path, request.query_string
+
+
+def _retrieve(task: asyncio.Task):
+    # every client of the producer may be gone; retrieve the outcome so it is not reported as unhandled
+    if not task.cancelled():
+        task.exception()
+
+
+class CachePolicy:
+    def __init__(self, ttl: float, key: Optional[Callable[[Any], Hashable]] = None,
+                 max_entries: int = 1024, statuses: tuple[int, ...] = (200,)):
+        self.ttl = ttl
+        self.key = key or default_cache_key
+        self.max_entries = max_entries
+        self.statuses = statuses
+
+
+class ResponseCache:
+    def __init__(self, policy: CachePolicy):
+        self.policy = policy
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.bypasses = 0
+        self.coalesced = 0
+        # set when middleware wraps the route, so header changes never touch the shared entry
+        self.copy_responses = False
+        self._entries: OrderedDict[Hashable, tuple[float, PrebuiltResponse]] = OrderedDict()
+        self._inflight: Dict[Hashable, asyncio.Task] = {}
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _lookup(self, key: Hashable) -> Optional[PrebuiltResponse]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires, response = entry
+        if expires <= time.monotonic():
+            del self._entries[key]
+            self.expirations += 1
+            return None
+        self._entries.move_to_end(key)
+        return response
+
+    def _store(self, key: Hashable, response: HTTPResponse) -> HTTPResponse:
+        if (response.status_code not in self.policy.statuses
+                or isinstance(response, (StreamingResponse, FileStreamResponse))):
+            return response
+
+        if not isinstance(response, PrebuiltResponse):
+            body, default_type = response._encode_body()
+            headers = dict(response.headers)
+            if default_type and 'Content-Type' not in headers:
+                headers['Content-Type'] = default_type
+            response = PrebuiltResponse(body, response.status_code, headers)
+
+        self._entries[key] = (time.monotonic() + self.policy.ttl, response)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.policy.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+        return response
+
+    async def fetch(self, request, produce: Callable[[], Awaitable[HTTPResponse]],
+                    variant: Hashable = None) -> HTTPResponse:
+        cache_control = request.headers.get('cache-control', '').lower()
+        if 'no-store' in cache_control:
+            self.bypasses += 1
+            return await produce()
+
+        key = (self.policy.key(request), variant)
+        if 'no-cache' not in cache_control and 'no-cache' not in request.headers.get('pragma', '').lower():
+            response = self._lookup(key)
+            if response is not None:
+                self.hits += 1
+                return response.copy() if self.copy_responses else response
+        else:
+            self.bypasses += 1
+
+        task = self._inflight.get(key)
+        if task is not None:
+            self.coalesced += 1
+        else:
+            self.misses += 1
+            # the producer runs in its own task so a leader whose client goes away does not cancel the followers
+            task = asyncio.ensure_future(self._produce(key, produce))
+            task.add_done_callback(_retrieve)
+            self._inflight[key] = task
+
+        response = await asyncio.shield(task)
+        if self.copy_responses and isinstance(response, PrebuiltResponse):
+            return response.copy()
+        return response
+
+    async def _produce(self, key: Hashable, produce: Callable[[], Awaitable[HTTPResponse]]) -> HTTPResponse:
+        try:
+            return self._store(key, await produce())
+        finally:
+            del self._inflight[key]
+
+    def clear(self):
+        self._entries.clear()
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            'entries': len(self._entries),
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'expirations': self.expirations,
+            'bypasses': self.bypasses,
+            'coalesced': self.coalesced,
+        }
@@ -0,0 +1,139 @@
+import asyncio
+import gzip
+import zlib
+from typing import Callable, Dict, Iterable, Optional
+
+from WebRestAPI.response import HTTPResponse, StreamingResponse, FileStreamResponse, PrebuiltResponse
+
+MINIMUM_SIZE = 500
+THREAD_THRESHOLD = 64 * 1024
+
+COMPRESSIBLE_TYPES = (
+    'text/',
+    'application/json',
+    'application/javascript',
+    'application/xml',
+    'application/xhtml+xml',
+    'image/svg+xml',
+)
+COMPRESSIBLE_SUFFIXES = ('+json', '+xml')
+
+
+def parse_accept_encoding(header: str) -> Dict[str, float]:
+    encodings = {}
+    for item in header.split(','):
+        token, _, params = item.partition(';')
+        token = token.strip().lower()
+        if not token:
+            continue
+        quality = 1.0
+        for param in params.split(';'):
+            name, _, value = param.strip().partition('=')
+            if name.lower() == 'q':
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        encodings[token] = quality
+    return encodings
+
+
+def _brotli() -> Optional[Callable[[bytes, int], bytes]]:
+    try:
+        import brotli
+    except ImportError:
+        return None
+    return lambda data, level: brotli.compress(data, quality=min(level, 11))
+
+
+def _gzip(data: bytes, level: int) -> bytes:
+    return gzip.compress(data, compresslevel=level, mtime=0)
+
+
+def _deflate(data: bytes, level: int) -> bytes:
+    return zlib.compress(data, level)
+
+
+class Compressor:
+    def __init__(self, minimum_size: int = MINIMUM_SIZE, level: int = 6,
+                 encodings: Iterable[str] = ('br', 'gzip', 'deflate'),
+                 content_types: Iterable[str] = COMPRESSIBLE_TYPES,
+                 thread_threshold: int = THREAD_THRESHOLD):
+        self.minimum_size = minimum_size
+        self.level = level
+        self.content_types = tuple(content_types)
+        self.thread_threshold = thread_threshold
+
+        available = {'gzip': _gzip, 'deflate': _deflate}
+        brotli = _brotli()
+        if brotli is not None:
+            available['br'] = brotli
+        self._compressors = {name: available[name] for name in encodings if name in available}
+        self.encodings = tuple(self._compressors)
+
+    def compressible(self, content_type: Optional[str]) -> bool:
+        if not content_type:
+            return False
+        media_type = content_type.split(';', 1)[0].strip().lower()
+        return media_type.startswith(self.content_types) or media_type.endswith(COMPRESSIBLE_SUFFIXES)
+
+    def negotiate(self, accept_encoding: str) -> Optional[str]:
+        if not accept_encoding:
+            return None
+        accepted = parse_accept_encoding(accept_encoding)
+        wildcard = accepted.get('*', 0.0)
+        best = None
+        best_quality = 0.0
+        for name in self.encodings:
+            quality = accepted.get(name, wildcard)
+            if quality > best_quality:
+                best, best_quality = name, quality
+        return best
+
+    async def compress(self, data: bytes, encoding: str) -> bytes:
+        compress = self._compressors[encoding]
+        if len(data) < self.thread_threshold:
+            return compress(data, self.level)
+        return await asyncio.get_running_loop().run_in_executor(None, compress, data, self.level)
+
+    async def apply(self, request, response: HTTPResponse) -> HTTPResponse:
+        if isinstance(response, (StreamingResponse, FileStreamResponse, PrebuiltResponse)):
+            return response
+        if response.status_code < 200 or response.status_code in (204, 304):
+            return response
+
+        if 'Content-Encoding' in response.headers:
+            return response
+
+        # the handler may return a shared response object, so the result is always a new one; it keeps
+        # the encoded body so the response is not serialized a second time when it is built
+        body, default_type = response._encode_body()
+        headers = dict(response.headers)
+        content_type = headers.get('Content-Type', default_type)
+        if content_type:
+            headers['Content-Type'] = content_type
+        response = HTTPResponse(body, response.status_code, headers)
+        if len(body) < self.minimum_size or not self.compressible(content_type):
+            return response
+
+        vary = headers.get('Vary')
+        if not vary:
+            headers['Vary'] = 'Accept-Encoding'
+        elif 'accept-encoding' not in vary.lower() and vary != '*':
+            headers['Vary'] = f"{vary}, Accept-Encoding"
+
+        encoding = self.negotiate(request.headers.get('accept-encoding', ''))
+        if encoding is None:
+            return response
+
+        compressed = await self.compress(body, encoding)
+        if len(compressed) >= len(body):
+            return response
+
+        response.content = compressed
+        headers['Content-Encoding'] = encoding
+        headers.pop('Content-Length', None)
+        etag = headers.get('ETag')
+        if etag and not etag.startswith('W/'):
+            headers['ETag'] = f"W/{etag}"
+        return response
@@ -1,18 +1,41 @@
+import warnings
+from typing import Union
 from WebRestAPI.routes import Router
+from WebRestAPI.json_codec import JSONCodec
+from WebRestAPI.compression import Compressor
+from WebRestAPI.middleware import Middleware
 
 class APIConfiguration:
     def __init__(self,
                  host: str = "localhost", port: int = 8000,queue: int = 15,
                  routes: list['Router'] = [] ,debug: bool = False,
-                 IPversion: str = "IPv4" , protocol: str = "TCP",setblocking: bool = True,
+                 IPversion: str = "IPv4" , protocol: str = "TCP",setblocking: bool | None = None,
                  protocol_number: int = 0, fileno: None = None,client_timeout: int = 30,
-                 read_request_byte_size: int = 1024 , user_favicon: bool = False):
+                 read_request_byte_size: int | None = None , user_favicon: bool = False,
+                 keep_alive_timeout: int = 5, max_keep_alive_requests: int = 100,
+                 thread_pool_size: int | None = None, process_pool_size: int | None = None,
+                 reuse_port: bool = False, graceful_timeout: int = 30,
+                 json_codec: Union[str, JSONCodec] = "auto",
+                 max_body_size: int | None = None, max_part_size: int | None = None,
+                 multipart_spool_size: int = 1024 * 1024,
+                 compression: Union[bool, Compressor] = False,
+                 middleware: list[Middleware] | None = None,
+                 write_buffer_high: int = 64 * 1024, write_buffer_low: int | None = None,
+                 write_timeout: int = 30, log_level: int | str | None = None,
+                 access_log: bool = False, json_logs: bool = False,
+                 metrics: bool = False, metrics_path: str | None = "/metrics"):
+
+        # the asyncio transport always uses non-blocking sockets and reads whatever is available,
+        # so these options have no effect
+        for name, value in (("setblocking", setblocking), ("read_request_byte_size", read_request_byte_size)):
+            if value is not None:
+                warnings.warn(f"APIConfiguration({name}=...) is deprecated and ignored", DeprecationWarning, stacklevel=2)
 
         self.host: str = host
         self.port: int = port
         self.routes: list['Router'] | None = routes
-        self.read_request_byte_size: int = read_request_byte_size
-        self.setblocking: bool = setblocking
+        self.read_request_byte_size: int | None = read_request_byte_size
+        self.setblocking: bool | None = setblocking
         self.client_timeout: int = client_timeout
         self.protocol_number: int = protocol_number
         self.queue: int = queue
@@ -21,6 +44,30 @@ class APIConfiguration:
         self.debug: bool = debug
         self.fileno = fileno
         self.user_favicon: bool = user_favicon
+        self.keep_alive_timeout: int = keep_alive_timeout
+        self.max_keep_alive_requests: int = max_keep_alive_requests
+        self.thread_pool_size: int | None = thread_pool_size
+        self.process_pool_size: int | None = process_pool_size
+        self.reuse_port: bool = reuse_port
+        self.graceful_timeout: int = graceful_timeout
+        self.json_codec: Union[str, JSONCodec] = json_codec
+        self.max_body_size: int | None = max_body_size
+        self.max_part_size: int | None = max_part_size
+        self.multipart_spool_size: int = multipart_spool_size
+        self.compression: Union[bool, Compressor] = compression
+        self.middleware: list[Middleware] = list(middleware or [])
+        self.write_buffer_high: int = write_buffer_high
+        self.write_buffer_low: int | None = write_buffer_low
+        self.write_timeout: int = write_timeout
+        self.log_level: int | str | None = log_level
+        self.access_log: bool = access_log
+        self.json_logs: bool = json_logs
+        self.metrics: bool = metrics
+        self.metrics_path: str | None = metrics_path
 
     def include_router(self, route: 'Router') -> None:
-        self.routes.append(route)
\ No newline at end of file
+        self.routes.append(route)
+
+    def add_middleware(self, middleware: Middleware) -> Middleware:
+        self.middleware.append(middleware)
+        return middleware
\ No newline at end of file
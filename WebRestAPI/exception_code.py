@@ -10,5 +10,22 @@ class InvalidProtocolError(Exception):
 
 class InvalidUrlError(Exception):
     def __init__(self, message="Invalid URL in methods."):
+        self.message = message
+        super().__init__(self.message)
+
+class HTTPParseError(Exception):
+    def __init__(self, message="Bad Request", status_code: int = 400):
+        self.message = message
+        self.status_code = status_code
+        super().__init__(self.message)
+
+class InvalidExecutorError(Exception):
+    def __init__(self, message="Invalid executor. Valid executors are loop, thread, process."):
+        self.message = message
+        super().__init__(self.message)
+
+
+class ClientDisconnectedError(Exception):
+    def __init__(self, message="Client disconnected before the request body was received."):
         self.message = message
         super().__init__(self.message)
\ No newline at end of file
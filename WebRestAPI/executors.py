@@ -0,0 +1,141 @@
+import asyncio
+import functools
+import importlib
+import inspect
+import multiprocessing
+import os
+from concurrent.futures import Executor, ThreadPoolExecutor, ProcessPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+from WebRestAPI.exception_code import InvalidExecutorError
+
+EXECUTOR_LOOP = "loop"
+EXECUTOR_THREAD = "thread"
+EXECUTOR_PROCESS = "process"
+EXECUTORS = (EXECUTOR_LOOP, EXECUTOR_THREAD, EXECUTOR_PROCESS)
+
+
+def _call_sync(func: Callable, kwargs: Dict[str, Any]) -> Any:
+    result = func(**kwargs)
+    if inspect.iscoroutine(result):
+        return asyncio.run(result)
+    return result
+
+
+def _call_in_process(module_name: str, qualname: str, kwargs: Dict[str, Any]) -> Any:
+    target = importlib.import_module(module_name)
+    for part in qualname.split('.'):
+        target = getattr(target, part)
+    return _call_sync(inspect.unwrap(target), kwargs)
+
+
+class HandlerExecutor:
+    def __init__(self, kind: str, max_workers: Optional[int] = None):
+        self.kind = kind
+        self.max_workers = max_workers
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self.in_flight = 0
+        self._executor: Optional[Executor] = None
+
+    @property
+    def workers(self) -> int:
+        if self.max_workers:
+            return self.max_workers
+        if self.kind == EXECUTOR_PROCESS:
+            return os.cpu_count() or 1
+        return min(32, (os.cpu_count() or 1) + 4)
+
+    @property
+    def queue_depth(self) -> int:
+        return max(self.in_flight - self.workers, 0)
+
+    def _get_executor(self) -> Executor:
+        if self._executor is None:
+            if self.kind == EXECUTOR_PROCESS:
+                # forked workers would inherit (and keep open) the client sockets of the server
+                method = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+                self._executor = ProcessPoolExecutor(max_workers=self.workers,
+                                                     mp_context=multiprocessing.get_context(method))
+            else:
+                self._executor = ThreadPoolExecutor(max_workers=self.workers,
+                                                    thread_name_prefix="WebRestAPI-handler")
+        return self._executor
+
+    async def run(self, func: Callable, kwargs: Dict[str, Any]) -> Any:
+        if self.kind == EXECUTOR_PROCESS:
+            call = functools.partial(_call_in_process, func.__module__, func.__qualname__, kwargs)
+        else:
+            call = functools.partial(_call_sync, func, kwargs)
+
+        loop = asyncio.get_running_loop()
+        self.submitted += 1
+        self.in_flight += 1
+        try:
+            return await loop.run_in_executor(self._get_executor(), call)
+        except Exception:
+            self.failed += 1
+            raise
+        finally:
+            self.in_flight -= 1
+            self.completed += 1
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            'workers': self.workers,
+            'submitted': self.submitted,
+            'completed': self.completed,
+            'failed': self.failed,
+            'in_flight': self.in_flight,
+            'active': min(self.in_flight, self.workers),
+            'queue_depth': self.queue_depth,
+        }
+
+    def shutdown(self, wait: bool = True):
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait, cancel_futures=not wait)
+            self._executor = None
+
+
+class ExecutorPools:
+    def __init__(self):
+        self.thread = HandlerExecutor(EXECUTOR_THREAD)
+        self.process = HandlerExecutor(EXECUTOR_PROCESS)
+
+    def configure(self, thread_workers: Optional[int] = None, process_workers: Optional[int] = None):
+        self.shutdown(wait=False)
+        self.thread = HandlerExecutor(EXECUTOR_THREAD, thread_workers)
+        self.process = HandlerExecutor(EXECUTOR_PROCESS, process_workers)
+
+    def get(self, kind: str) -> HandlerExecutor:
+        return self.process if kind == EXECUTOR_PROCESS else self.thread
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        return {
+            EXECUTOR_THREAD: self.thread.stats(),
+            EXECUTOR_PROCESS: self.process.stats(),
+        }
+
+    def shutdown(self, wait: bool = True):
+        self.thread.shutdown(wait=wait)
+        self.process.shutdown(wait=wait)
+
+
+def resolve_executor(func: Callable, executor: Optional[str]) -> str:
+    if executor is None:
+        return EXECUTOR_LOOP if inspect.iscoroutinefunction(func) else EXECUTOR_THREAD
+
+    if executor not in EXECUTORS:
+        raise InvalidExecutorError(f"Invalid executor '{executor}'. Valid executors are {', '.join(EXECUTORS)}.")
+
+    if executor == EXECUTOR_LOOP and not inspect.iscoroutinefunction(func):
+        raise InvalidExecutorError(f"Handler {func.__qualname__} must be async to run on the event loop.")
+
+    if executor == EXECUTOR_PROCESS and '<locals>' in func.__qualname__:
+        raise InvalidExecutorError(f"Handler {func.__qualname__} must be a module-level function to run in a process.")
+
+    return executor
+
+
+pools = ExecutorPools()
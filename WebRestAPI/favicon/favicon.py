@@ -1,4 +1,4 @@
-import asyncio
+import os
 from WebRestAPI import HTTPResponse
 from WebRestAPI.files.files import GetPathDirectory, File
 
@@ -8,10 +8,21 @@ class Favicon:
         self.favicon_path = favicon_path
         self.favicon_data = b""
         self.response = None
+        self._mtime_ns = None
 
     async def build(self):
+        try:
+            mtime_ns = os.stat(self.favicon_path).st_mtime_ns
+        except OSError:
+            mtime_ns = None
+
+        if self.response is not None and mtime_ns == self._mtime_ns:
+            return self.response
+
+        self.favicon_data = bytes(await File.read(self.favicon_path , "rb"))
+        self._mtime_ns = mtime_ns
         self.response = HTTPResponse(
-            content=bytes(await File.read(self.favicon_path , "rb")),
+            content=self.favicon_data,
             status_code=200,
             headers={
                 'Content-Type': 'image/png',
@@ -27,4 +38,3 @@ class Favicon:
 
     def __response__(self):
         return self.response
-
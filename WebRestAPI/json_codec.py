@@ -0,0 +1,129 @@
+import dataclasses
+import datetime
+import decimal
+import enum
+import json
+import uuid
+from typing import Any, Callable, Dict, Union
+
+
+def default(obj: Any) -> Any:
+    if dataclasses.is_dataclass(obj) and not isinstance(obj, type):
+        return dataclasses.asdict(obj)
+    if isinstance(obj, (datetime.datetime, datetime.date, datetime.time)):
+        return obj.isoformat()
+    if isinstance(obj, uuid.UUID):
+        return str(obj)
+    if isinstance(obj, decimal.Decimal):
+        return str(obj)
+    if isinstance(obj, enum.Enum):
+        return obj.value
+    if isinstance(obj, (set, frozenset, tuple)):
+        return list(obj)
+    if isinstance(obj, bytes):
+        return obj.decode('utf-8', errors='replace')
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+class JSONCodec:
+    name = "json"
+
+    def dumps(self, obj: Any) -> bytes:
+        return json.dumps(obj, ensure_ascii=False, default=default).encode('utf-8')
+
+    def loads(self, data: Union[bytes, str]) -> Any:
+        return json.loads(data)
+
+
+class OrjsonCodec(JSONCodec):
+    name = "orjson"
+
+    def __init__(self):
+        import orjson
+        self._orjson = orjson
+        self._option = orjson.OPT_NON_STR_KEYS
+
+    def dumps(self, obj: Any) -> bytes:
+        return self._orjson.dumps(obj, default=default, option=self._option)
+
+    def loads(self, data: Union[bytes, str]) -> Any:
+        return self._orjson.loads(data)
+
+
+class MsgspecCodec(JSONCodec):
+    name = "msgspec"
+
+    def __init__(self):
+        import msgspec
+        self._encoder = msgspec.json.Encoder(enc_hook=default)
+        self._decoder = msgspec.json.Decoder()
+
+    def dumps(self, obj: Any) -> bytes:
+        return self._encoder.encode(obj)
+
+    def loads(self, data: Union[bytes, str]) -> Any:
+        return self._decoder.decode(data)
+
+
+class UjsonCodec(JSONCodec):
+    name = "ujson"
+
+    def __init__(self):
+        import ujson
+        self._ujson = ujson
+
+    def dumps(self, obj: Any) -> bytes:
+        return self._ujson.dumps(obj, ensure_ascii=False, default=default).encode('utf-8')
+
+    def loads(self, data: Union[bytes, str]) -> Any:
+        return self._ujson.loads(data)
+
+
+CODECS: Dict[str, Callable[[], JSONCodec]] = {
+    "orjson": OrjsonCodec,
+    "msgspec": MsgspecCodec,
+    "ujson": UjsonCodec,
+    "json": JSONCodec,
+}
+AUTO_ORDER = ("orjson", "msgspec", "ujson", "json")
+
+_codec: JSONCodec = JSONCodec()
+
+
+def register_codec(name: str, factory: Callable[[], JSONCodec]):
+    CODECS[name] = factory
+
+
+def create_codec(codec: Union[str, JSONCodec] = "auto") -> JSONCodec:
+    if isinstance(codec, JSONCodec):
+        return codec
+
+    if codec == "auto":
+        for name in AUTO_ORDER:
+            try:
+                return CODECS[name]()
+            except ImportError:
+                continue
+
+    factory = CODECS.get(codec)
+    if factory is None:
+        raise ValueError(f"Unknown JSON codec '{codec}'. Valid codecs are auto, {', '.join(CODECS)}.")
+    return factory()
+
+
+def set_codec(codec: Union[str, JSONCodec] = "auto") -> JSONCodec:
+    global _codec
+    _codec = create_codec(codec)
+    return _codec
+
+
+def get_codec() -> JSONCodec:
+    return _codec
+
+
+def dumps(obj: Any) -> bytes:
+    return _codec.dumps(obj)
+
+
+def loads(data: Union[bytes, str]) -> Any:
+    return _codec.loads(data)
@@ -1,4 +1,4 @@
-from WebRestAPI.log.log import APIlog,error_l,log_l,debug_l
+from WebRestAPI.log.log import APIlog,error_l,log_l,debug_l,DEBUG,INFO,ERROR
 
 class FuncLog:
     info= APIlog.log
@@ -16,4 +16,7 @@ __all__ = [
     "error_l",
     "log_l",
     "debug_l",
+    "DEBUG",
+    "INFO",
+    "ERROR",
 ]
\ No newline at end of file
@@ -1,15 +1,95 @@
+import atexit
+import json
+import os
+import queue
+import sys
+import threading
+import time
 from datetime import datetime
+from typing import Optional, TextIO, Union
 
-from WebRestAPI.template_string.template import Template
+DEBUG = 10
+INFO = 20
+ERROR = 40
+LEVELS = {"debug": DEBUG, "info": INFO, "log": INFO, "error": ERROR}
+LEVEL_NAMES = {DEBUG: "debug", INFO: "info", ERROR: "error"}
+BATCH_SIZE = 256
 
 error_l: list[int] = [31, 40, 1]
 log_l: list[int] = [37, 40, 1]
 debug_l: list[int] = [33, 40, 1]
 
+_STOP = object()
 
 
+def _color(codes: list[int]) -> str:
+    return f"\033[{codes[2]};{codes[0]};{codes[1]}m"
+
+
+class _LogWriter(threading.Thread):
+    def __init__(self):
+        super().__init__(name="WebRestAPI-log", daemon=True)
+        self.queue = queue.SimpleQueue()
+        self._second = None
+        self._stamp = ""
+
+    def run(self):
+        records = self.queue
+        while True:
+            batch = [records.get()]
+            while len(batch) < BATCH_SIZE:
+                try:
+                    batch.append(records.get_nowait())
+                except queue.Empty:
+                    break
+
+            stop = any(record is _STOP for record in batch)
+            lines = [self._format(record) for record in batch if record is not _STOP]
+            if lines:
+                self._write(''.join(lines))
+            if stop:
+                return
+
+    def _format(self, record: tuple) -> str:
+        created, level, text, fields = record
+        if APIlog.json_lines:
+            entry = {
+                "time": datetime.fromtimestamp(created).isoformat(timespec="milliseconds"),
+                "level": LEVEL_NAMES.get(level, str(level)),
+                "message": text,
+            }
+            if fields:
+                entry.update(fields)
+            return json.dumps(entry, ensure_ascii=False, default=str) + "\n"
+
+        second = int(created)
+        if second != self._second:
+            self._second = second
+            self._stamp = datetime.fromtimestamp(second).strftime("%d.%m.%Y %H:%M:%S")
+        if level == DEBUG:
+            return f"{_color(debug_l)}[DEBUG] {self._stamp} <= {text}\n"
+        if level >= ERROR:
+            return f"{_color(error_l)} {self._stamp} <= {text}\n"
+        return f"{_color(log_l)} {self._stamp} <= {text}\n"
+
+    def _write(self, data: str):
+        stream = APIlog.stream or sys.stdout
+        try:
+            stream.write(data)
+            stream.flush()
+        except (OSError, ValueError):
+            pass
+
 
 class APIlog:
+    level: int = DEBUG
+    json_lines: bool = False
+    access_log: bool = False
+    stream: Optional[TextIO] = None
+
+    _writer: Optional[_LogWriter] = None
+    _lock = threading.Lock()
+
     @staticmethod
     def BasicConfig(error: list[int] | None = None,
                     log: list[int] | None = None,
@@ -17,31 +97,85 @@ class APIlog:
         global error_l, log_l, debug_l
         if error is not None:
             error_l = error
-        if log_l is not None:
+        if log is not None:
             log_l = log
-        if debug_l is not None:
+        if debug is not None:
             debug_l = debug
 
+    @staticmethod
+    def configure(level: Union[int, str, None] = None, json_lines: bool | None = None,
+                  access_log: bool | None = None, stream: Optional[TextIO] = None):
+        if level is not None:
+            APIlog.level = LEVELS[level.lower()] if isinstance(level, str) else level
+        if json_lines is not None:
+            APIlog.json_lines = json_lines
+        if access_log is not None:
+            APIlog.access_log = access_log
+        if stream is not None:
+            APIlog.stream = stream
+
+    @staticmethod
+    def _emit(level: int, text: str, fields: dict | None = None):
+        writer = APIlog._writer
+        if writer is None:
+            with APIlog._lock:
+                writer = APIlog._writer
+                if writer is None:
+                    writer = _LogWriter()
+                    writer.start()
+                    APIlog._writer = writer
+        writer.queue.put((time.time(), level, text, fields))
+
     @staticmethod
     def error(text: str):
-        now = datetime.now().strftime("%d.%m.%Y %H:%M:%S")
-        print(Template("$CODE $TIME <= $text").connect(
-            {"CODE": "\033[" + str(error_l[2]) + ";" + str(error_l[0]) + ";" + str(error_l[1]) + "m", "TIME": now,
-             "text": text}
-        ))
+        if APIlog.level > ERROR:
+            return
+        APIlog._emit(ERROR, text)
 
     @staticmethod
     def log(text: str):
-        now = datetime.now().strftime("%d.%m.%Y %H:%M:%S")
-        print(Template("$CODE $TIME <= $text").connect(
-            {"CODE": "\033[" + str(log_l[2]) + ";" + str(log_l[0]) + ";" + str(log_l[1]) + "m",
-             "TIME": now, "text": text}
-        ))
+        if APIlog.level > INFO:
+            return
+        APIlog._emit(INFO, text)
 
     @staticmethod
     def debug(text: str):
-        now = datetime.now().strftime("%d.%m.%Y %H:%M:%S")
-        print(Template("$CODE[DEBUG] $TIME <= $text").connect(
-            {"CODE": "\033[" + str(debug_l[2]) + ";" + str(debug_l[0]) + ";" + str(debug_l[1]) + "m",
-             "TIME": now, "text": text}
-        ))
+        if APIlog.level > DEBUG:
+            return
+        APIlog._emit(DEBUG, text)
+
+    @staticmethod
+    def access(method: str, path: str, http_version: str, status_code: int,
+               size: int, duration: float, client=None):
+        if not APIlog.access_log:
+            return
+        host = client[0] if client else "-"
+        duration_ms = round(duration * 1000, 3)
+        APIlog._emit(INFO, f'{host} "{method} {path} {http_version}" {status_code} {size} {duration_ms}ms', {
+            "client": host,
+            "method": method,
+            "path": path,
+            "status": status_code,
+            "bytes": size,
+            "duration_ms": duration_ms,
+        })
+
+    @staticmethod
+    def shutdown(timeout: float = 1.0):
+        writer = APIlog._writer
+        if writer is None:
+            return
+        APIlog._writer = None
+        writer.queue.put(_STOP)
+        writer.join(timeout)
+
+
+def _after_fork():
+    # the writer thread does not survive fork; the child starts its own on the next record
+    APIlog._writer = None
+    APIlog._lock = threading.Lock()
+
+
+atexit.register(APIlog.shutdown)
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_after_fork)
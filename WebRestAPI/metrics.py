@@ -0,0 +1,159 @@
+import bisect
+import socket
+import struct
+from collections import defaultdict
+from typing import Dict, Optional
+
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+PHASES = ('parse', 'handler', 'write')
+UNMATCHED = "unmatched"
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+TCP_INFO_SIZE = 104
+# for a listening socket Linux reports the accept queue length in tcpi_unacked and the backlog in tcpi_sacked
+TCP_INFO_ACCEPT_QUEUE = struct.Struct('II')
+TCP_INFO_ACCEPT_QUEUE_OFFSET = 24
+
+
+def _label(value) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _labels(**labels) -> str:
+    return ','.join(f'{name}="{_label(value)}"' for name, value in labels.items())
+
+
+def _number(value) -> str:
+    if isinstance(value, float):
+        return repr(value)
+    return str(value)
+
+
+class Histogram:
+    __slots__ = ('buckets', 'counts', 'sum', 'count')
+
+    def __init__(self, buckets: tuple[float, ...] = LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def render(self, name: str, labels: str) -> list[str]:
+        prefix = f"{labels}," if labels else ""
+        lines = []
+        total = 0
+        for bound, count in zip(self.buckets, self.counts):
+            total += count
+            lines.append(f'{name}_bucket{{{prefix}le="{bound}"}} {total}')
+        lines.append(f'{name}_bucket{{{prefix}le="+Inf"}} {self.count}')
+        suffix = f"{{{labels}}}" if labels else ""
+        lines.append(f"{name}_sum{suffix} {_number(self.sum)}")
+        lines.append(f"{name}_count{suffix} {self.count}")
+        return lines
+
+
+class Metrics:
+    # counters are plain attributes updated from the worker's event loop thread; each worker process
+    # keeps and exports its own set
+    def __init__(self, buckets: tuple[float, ...] = LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.socket: Optional[socket.socket] = None
+        self.in_flight = 0
+        self.connections = 0
+        self.connections_total = 0
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self.requests: Dict[tuple, int] = defaultdict(int)
+        self.parse_errors: Dict[int, int] = defaultdict(int)
+        self.latency: Dict[tuple, Histogram] = {}
+        self.phases: Dict[str, Histogram] = {phase: Histogram(buckets) for phase in PHASES}
+
+    def observe(self, method: str, route: Optional[str], status_code: int, duration: float,
+                handler: float, write: float):
+        key = (method, route or UNMATCHED)
+        self.requests[key + (status_code,)] += 1
+        histogram = self.latency.get(key)
+        if histogram is None:
+            histogram = self.latency[key] = Histogram(self.buckets)
+        histogram.observe(duration)
+        self.phases['handler'].observe(handler)
+        self.phases['write'].observe(write)
+
+    def accept_queue(self) -> Optional[tuple[int, int]]:
+        sock = self.socket
+        if sock is None or not hasattr(socket, 'TCP_INFO'):
+            return None
+        try:
+            info = sock.getsockopt(socket.IPPROTO_TCP, socket.TCP_INFO, TCP_INFO_SIZE)
+        except OSError:
+            return None
+        if len(info) < TCP_INFO_ACCEPT_QUEUE_OFFSET + TCP_INFO_ACCEPT_QUEUE.size:
+            return None
+        return TCP_INFO_ACCEPT_QUEUE.unpack_from(info, TCP_INFO_ACCEPT_QUEUE_OFFSET)
+
+    def render(self) -> str:
+        lines = [
+            "# HELP webrestapi_requests_total Requests answered, by method, route template and status code.",
+            "# TYPE webrestapi_requests_total counter",
+        ]
+        for (method, route, status_code), count in sorted(self.requests.items()):
+            lines.append(f"webrestapi_requests_total{{{_labels(method=method, route=route, status=status_code)}}} {count}")
+
+        lines += [
+            "# HELP webrestapi_parse_errors_total Requests rejected by the HTTP parser, by status code.",
+            "# TYPE webrestapi_parse_errors_total counter",
+        ]
+        for status_code, count in sorted(self.parse_errors.items()):
+            lines.append(f"webrestapi_parse_errors_total{{{_labels(status=status_code)}}} {count}")
+
+        lines += [
+            "# HELP webrestapi_request_duration_seconds Time from dispatch to the last byte written, by route template.",
+            "# TYPE webrestapi_request_duration_seconds histogram",
+        ]
+        for (method, route), histogram in sorted(self.latency.items()):
+            lines += histogram.render("webrestapi_request_duration_seconds", _labels(method=method, route=route))
+
+        lines += [
+            "# HELP webrestapi_phase_duration_seconds Time spent parsing input, running handlers and writing responses.",
+            "# TYPE webrestapi_phase_duration_seconds histogram",
+        ]
+        for phase, histogram in self.phases.items():
+            lines += histogram.render("webrestapi_phase_duration_seconds", _labels(phase=phase))
+
+        lines += [
+            "# HELP webrestapi_requests_in_flight Requests currently being handled.",
+            "# TYPE webrestapi_requests_in_flight gauge",
+            f"webrestapi_requests_in_flight {self.in_flight}",
+            "# HELP webrestapi_connections Open client connections.",
+            "# TYPE webrestapi_connections gauge",
+            f"webrestapi_connections {self.connections}",
+            "# HELP webrestapi_connections_total Client connections accepted.",
+            "# TYPE webrestapi_connections_total counter",
+            f"webrestapi_connections_total {self.connections_total}",
+            "# HELP webrestapi_received_bytes_total Bytes read from clients.",
+            "# TYPE webrestapi_received_bytes_total counter",
+            f"webrestapi_received_bytes_total {self.bytes_in}",
+            "# HELP webrestapi_sent_bytes_total Bytes written to clients.",
+            "# TYPE webrestapi_sent_bytes_total counter",
+            f"webrestapi_sent_bytes_total {self.bytes_out}",
+        ]
+
+        accept_queue = self.accept_queue()
+        if accept_queue is not None:
+            length, limit = accept_queue
+            lines += [
+                "# HELP webrestapi_accept_queue_length Connections waiting in the listen socket's accept queue.",
+                "# TYPE webrestapi_accept_queue_length gauge",
+                f"webrestapi_accept_queue_length {length}",
+                "# HELP webrestapi_accept_queue_limit Accept queue size of the listen socket.",
+                "# TYPE webrestapi_accept_queue_limit gauge",
+                f"webrestapi_accept_queue_limit {limit}",
+            ]
+
+        lines.append("")
+        return "\n".join(lines)
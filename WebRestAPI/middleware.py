@@ -0,0 +1,17 @@
+from typing import Any, Awaitable, Callable, Iterable
+
+Endpoint = Callable[[Any], Awaitable[Any]]
+Middleware = Callable[[Any, Endpoint], Awaitable[Any]]
+
+
+def _link(middleware: Middleware, call_next: Endpoint) -> Endpoint:
+    async def call(request):
+        return await middleware(request, call_next)
+
+    return call
+
+
+def compose(endpoint: Endpoint, middleware: Iterable[Middleware]) -> Endpoint:
+    for item in reversed(list(middleware)):
+        endpoint = _link(item, endpoint)
+    return endpoint
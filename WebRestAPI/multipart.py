@@ -0,0 +1,322 @@
+import asyncio
+import re
+import tempfile
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, AsyncIterator, Dict, Optional
+
+from WebRestAPI.exception_code import HTTPParseError
+
+SPOOL_SIZE = 1024 * 1024
+CHUNK_SIZE = 65536
+MAX_PART_HEADER_SIZE = 16384
+# once a part is on disk its data is written from a background thread in batches of WRITE_SIZE;
+# past MAX_QUEUED bytes waiting for the disk the parser blocks instead of buffering more
+WRITE_SIZE = 256 * 1024
+MAX_QUEUED = 8 * 1024 * 1024
+DISK_WRITERS = 4
+
+_BOUNDARY = re.compile(r'boundary="?([^";]+)"?')
+_NAME = re.compile(r';\s*name="([^"]+)"')
+_FILENAME = re.compile(r';\s*filename="([^"]+)"')
+
+
+def parse_boundary(content_type: str) -> Optional[bytes]:
+    match = _BOUNDARY.search(content_type)
+    if not match:
+        return None
+    return match.group(1).strip().encode('latin-1')
+
+
+_disk_writer: Optional[ThreadPoolExecutor] = None
+
+
+def _writer() -> ThreadPoolExecutor:
+    global _disk_writer
+    if _disk_writer is None:
+        _disk_writer = ThreadPoolExecutor(max_workers=DISK_WRITERS, thread_name_prefix="WebRestAPI-upload")
+    return _disk_writer
+
+
+class UploadFile:
+    _KEYS = ('filename', 'content', 'content_type', 'size')
+
+    def __init__(self, name: str, filename: str, content_type: str = 'application/octet-stream',
+                 headers: Dict[str, str] = None, spool_size: int = SPOOL_SIZE):
+        self.name = name
+        self.filename = filename
+        self.content_type = content_type
+        self.headers = headers or {}
+        self.size = 0
+        self._spool_size = spool_size
+        self._file = tempfile.SpooledTemporaryFile(max_size=spool_size)
+        self._spilled = False
+        self._pending = bytearray()
+        # updated from the loop and the writer thread respectively, so neither needs a lock
+        self._submitted = 0
+        self._written = 0
+        self._writing: Optional[Future] = None
+
+    @property
+    def in_memory(self) -> bool:
+        return not self._spilled and not getattr(self._file, '_rolled', True)
+
+    @property
+    def file(self):
+        self._wait()
+        return self._file
+
+    def write(self, data) -> int:
+        length = len(data)
+        self.size += length
+        if not self._spilled and self.size <= self._spool_size:
+            self._file.write(data)
+            return length
+        self._spilled = True
+        self._pending += data
+        if len(self._pending) >= WRITE_SIZE:
+            self._submit()
+        return length
+
+    def finish(self):
+        if self._spilled:
+            self._submit(rewind=True)
+        else:
+            self._file.seek(0)
+
+    def _submit(self, rewind: bool = False):
+        if self._submitted - self._written > MAX_QUEUED:
+            self._wait()
+        data = bytes(self._pending)
+        self._pending = bytearray()
+        self._submitted += len(data)
+        self._writing = _writer().submit(self._write_to_disk, self._writing, data, rewind)
+
+    def _write_to_disk(self, previous: Optional[Future], data: bytes, rewind: bool):
+        # each batch waits for the one submitted before it so the file is written in order
+        if previous is not None:
+            previous.result()
+        self._file.write(data)
+        self._written += len(data)
+        if rewind:
+            self._file.seek(0)
+
+    def _wait(self):
+        if self._writing is not None:
+            self._writing.result()
+
+    async def _settle(self):
+        if self._writing is not None:
+            await asyncio.wrap_future(self._writing)
+
+    async def read(self, size: int = -1) -> bytes:
+        await self._settle()
+        if self.in_memory:
+            return self._file.read(size)
+        return await asyncio.to_thread(self._file.read, size)
+
+    async def seek(self, offset: int) -> int:
+        await self._settle()
+        if self.in_memory:
+            return self._file.seek(offset)
+        return await asyncio.to_thread(self._file.seek, offset)
+
+    async def chunks(self, chunk_size: int = CHUNK_SIZE) -> AsyncIterator[bytes]:
+        await self.seek(0)
+        while True:
+            chunk = await self.read(chunk_size)
+            if not chunk:
+                break
+            yield chunk
+
+    def read_all(self) -> bytes:
+        self._wait()
+        position = self._file.tell()
+        self._file.seek(0)
+        try:
+            return self._file.read()
+        finally:
+            self._file.seek(position)
+
+    def close(self):
+        writing = self._writing
+        if writing is not None and not writing.done():
+            writing.add_done_callback(lambda _: self._file.close())
+        else:
+            self._file.close()
+
+    def __getitem__(self, key: str) -> Any:
+        if key == 'content':
+            return self.read_all()
+        if key in self._KEYS:
+            return getattr(self, key)
+        raise KeyError(key)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def keys(self):
+        return self._KEYS
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._KEYS
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state['_file'] = self.read_all()
+        state.update(_spilled=False, _pending=bytearray(), _submitted=0, _written=0, _writing=None)
+        return state
+
+    def __setstate__(self, state):
+        content = state.pop('_file')
+        self.__dict__.update(state)
+        self._file = tempfile.SpooledTemporaryFile(max_size=self._spool_size)
+        self._file.write(content)
+        self._file.seek(0)
+
+    def __repr__(self):
+        return f"UploadFile(name={self.name!r}, filename={self.filename!r}, size={self.size})"
+
+
+class MultipartParser:
+    _PREAMBLE = 0
+    _HEADERS = 1
+    _DATA = 2
+    _EPILOGUE = 3
+
+    def __init__(self, boundary: bytes, max_part_size: Optional[int] = None, spool_size: int = SPOOL_SIZE):
+        self.max_part_size = max_part_size
+        self.spool_size = spool_size
+        self.form: Dict[str, str] = {}
+        self.files: Dict[str, UploadFile] = {}
+        self._delimiter = b'\r\n--' + boundary
+        self._buffer = bytearray(b'\r\n')
+        self._state = self._PREAMBLE
+        self._name = None
+        self._target = None
+        self._size = 0
+
+    @property
+    def complete(self) -> bool:
+        return self._state == self._EPILOGUE
+
+    def feed(self, data: bytes):
+        if self._state == self._EPILOGUE:
+            return
+
+        buffer = self._buffer
+        buffer += data
+
+        while True:
+            if self._state == self._DATA:
+                index = buffer.find(self._delimiter)
+                if index == -1:
+                    keep = len(self._delimiter)
+                    if len(buffer) > keep:
+                        self._write(buffer, len(buffer) - keep)
+                        del buffer[:len(buffer) - keep]
+                    return
+                self._write(buffer, index)
+                del buffer[:index]
+                self._finish_part()
+                self._state = self._PREAMBLE
+
+            if self._state == self._PREAMBLE:
+                index = buffer.find(self._delimiter)
+                if index == -1:
+                    del buffer[:max(len(buffer) - len(self._delimiter), 0)]
+                    return
+                end = index + len(self._delimiter)
+                if len(buffer) < end + 2:
+                    del buffer[:index]
+                    return
+                marker = bytes(buffer[end:end + 2])
+                if marker == b'--':
+                    self._state = self._EPILOGUE
+                    buffer.clear()
+                    return
+                line_end = buffer.find(b'\r\n', end)
+                if line_end == -1:
+                    del buffer[:index]
+                    return
+                del buffer[:line_end + 2]
+                self._state = self._HEADERS
+
+            if self._state == self._HEADERS:
+                if buffer.startswith(b'\r\n'):
+                    headers_end = 0
+                else:
+                    headers_end = buffer.find(b'\r\n\r\n')
+                    if headers_end == -1:
+                        if len(buffer) > MAX_PART_HEADER_SIZE:
+                            raise HTTPParseError("Multipart headers too large", 431)
+                        return
+                    headers_end += 2
+                self._start_part(bytes(buffer[:headers_end]))
+                del buffer[:headers_end + 2]
+                self._state = self._DATA
+
+    def finish(self):
+        if self._state != self._EPILOGUE:
+            self.close()
+            raise HTTPParseError("Incomplete multipart body")
+
+    def close(self):
+        if isinstance(self._target, UploadFile):
+            self._target.close()
+        for upload in self.files.values():
+            upload.close()
+
+    def _start_part(self, raw_headers: bytes):
+        headers = {}
+        for line in raw_headers.split(b'\r\n'):
+            name, sep, value = line.decode('utf-8', errors='ignore').partition(':')
+            if sep:
+                headers[name.strip().lower()] = value.strip()
+
+        disposition = headers.get('content-disposition', '')
+        name_match = _NAME.search(disposition)
+        filename_match = _FILENAME.search(disposition)
+
+        self._size = 0
+        self._name = name_match.group(1) if name_match else None
+        if self._name is not None and filename_match:
+            self._target = UploadFile(
+                self._name,
+                filename_match.group(1),
+                headers.get('content-type', 'application/octet-stream'),
+                headers,
+                self.spool_size
+            )
+        else:
+            self._target = bytearray()
+
+    def _write(self, buffer: bytearray, length: int):
+        if not length:
+            return
+        self._size += length
+        if self.max_part_size and self._size > self.max_part_size:
+            self.close()
+            raise HTTPParseError("Payload Too Large", 413)
+        if self._name is None:
+            return
+        with memoryview(buffer) as view:
+            if isinstance(self._target, UploadFile):
+                self._target.write(view[:length])
+            else:
+                self._target += view[:length]
+
+    def _finish_part(self):
+        target = self._target
+        if isinstance(target, UploadFile):
+            target.finish()
+            previous = self.files.get(self._name)
+            if previous is not None:
+                previous.close()
+            self.files[self._name] = target
+        elif self._name is not None:
+            self.form[self._name] = target.decode('utf-8', errors='ignore')
+        self._name = None
+        self._target = None
@@ -0,0 +1,229 @@
+import enum
+
+from WebRestAPI.exception_code import HTTPParseError
+
+MAX_HEADER_SIZE = 65536
+MAX_CHUNK_LINE_SIZE = 4096
+COMPACT_THRESHOLD = 65536
+
+
+class ParserEvent(enum.Enum):
+    REQUEST_LINE = "request_line"
+    HEADERS = "headers"
+    BODY = "body"
+    COMPLETE = "complete"
+    ERROR = "error"
+
+
+class HTTPParser:
+    _REQUEST_LINE = 0
+    _HEADERS = 1
+    _BODY = 2
+    _CHUNK_SIZE = 3
+    _CHUNK_DATA = 4
+    _CHUNK_END = 5
+    _TRAILERS = 6
+
+    def __init__(self, max_header_size: int = MAX_HEADER_SIZE, max_body_size: int | None = None):
+        self.max_header_size = max_header_size
+        self.max_body_size = max_body_size
+        self._buffer = bytearray()
+        self._offset = 0
+        self.error: HTTPParseError | None = None
+        self._reset()
+
+    def _reset(self):
+        self._state = self._REQUEST_LINE
+        self._head_size = 0
+        self._remaining = 0
+        self._received = 0
+        self.method: str | None = None
+        self.target: str | None = None
+        self.http_version: str | None = None
+        self.headers: dict[str, str] = {}
+        self.content_length: int = 0
+        self.chunked: bool = False
+        self.keep_alive: bool = False
+
+    @property
+    def idle(self) -> bool:
+        return self._state == self._REQUEST_LINE and not self._buffer
+
+    def feed(self, data: bytes) -> list[tuple[ParserEvent, object]]:
+        if self.error is not None:
+            return []
+        events = []
+        try:
+            self._feed(data, events)
+        except HTTPParseError as e:
+            # events parsed before the error are kept so earlier pipelined requests still get answered
+            self.error = e
+            self._buffer.clear()
+            self._offset = 0
+            events.append((ParserEvent.ERROR, e))
+        return events
+
+    def _feed(self, data: bytes, events: list):
+        if self._buffer:
+            self._buffer += data
+            pos = self._process(self._buffer, self._offset, events)
+            if pos >= len(self._buffer):
+                self._buffer.clear()
+                self._offset = 0
+            elif pos > COMPACT_THRESHOLD:
+                del self._buffer[:pos]
+                self._offset = 0
+            else:
+                self._offset = pos
+        else:
+            pos = self._process(data, 0, events)
+            if pos < len(data):
+                self._buffer += memoryview(data)[pos:]
+                self._offset = 0
+
+    def _process(self, buf, pos: int, events: list) -> int:
+        end = len(buf)
+
+        while pos < end:
+            state = self._state
+            if state == self._BODY or state == self._CHUNK_DATA:
+                take = min(self._remaining, end - pos)
+                if isinstance(buf, bytes):
+                    chunk = buf[pos:pos + take]
+                else:
+                    with memoryview(buf) as view:
+                        chunk = bytes(view[pos:pos + take])
+                pos += take
+                self._remaining -= take
+                events.append((ParserEvent.BODY, chunk))
+                if not self._remaining:
+                    if state == self._BODY:
+                        self._complete(events)
+                    else:
+                        self._state = self._CHUNK_END
+                continue
+
+            line_end = buf.find(b'\r\n', pos)
+
+            if state == self._CHUNK_SIZE or state == self._CHUNK_END:
+                if line_end == -1:
+                    if end - pos > MAX_CHUNK_LINE_SIZE:
+                        raise HTTPParseError("Invalid chunk size")
+                    break
+                if state == self._CHUNK_SIZE:
+                    self._parse_chunk_size(buf[pos:line_end])
+                elif line_end != pos:
+                    raise HTTPParseError("Invalid chunk terminator")
+                else:
+                    self._state = self._CHUNK_SIZE
+                pos = line_end + 2
+                continue
+
+            if line_end == -1:
+                if self._head_size + end - pos > self.max_header_size:
+                    raise HTTPParseError("Request Header Fields Too Large", 431)
+                break
+
+            self._head_size += line_end + 2 - pos
+            if self._head_size > self.max_header_size:
+                raise HTTPParseError("Request Header Fields Too Large", 431)
+
+            if state == self._TRAILERS:
+                if line_end == pos:
+                    self._complete(events)
+            elif state == self._REQUEST_LINE:
+                if line_end != pos:
+                    self._parse_request_line(buf[pos:line_end], events)
+                else:
+                    self._head_size = 0
+            elif line_end == pos:
+                self._headers_complete(events)
+            else:
+                self._parse_header(buf[pos:line_end])
+
+            pos = line_end + 2
+
+        return pos
+
+    def _parse_request_line(self, line, events: list):
+        parts = line.split()
+        if len(parts) != 3 or not parts[2].startswith(b'HTTP/'):
+            raise HTTPParseError()
+
+        self.method, self.target, self.http_version = (part.decode('latin-1') for part in parts)
+        self._state = self._HEADERS
+        events.append((ParserEvent.REQUEST_LINE, (self.method, self.target, self.http_version)))
+
+    def _parse_header(self, line):
+        name, sep, value = line.partition(b':')
+        if not sep or not name or name != name.strip():
+            raise HTTPParseError()
+
+        key = name.decode('latin-1').lower()
+        value = value.strip().decode('utf-8', errors='ignore')
+        if key in self.headers:
+            self.headers[key] = f"{self.headers[key]}, {value}"
+        else:
+            self.headers[key] = value
+
+    def _headers_complete(self, events: list):
+        headers = self.headers
+
+        if 'transfer-encoding' in headers:
+            codings = [coding.strip() for coding in headers['transfer-encoding'].lower().split(',')]
+            if codings != ['chunked']:
+                raise HTTPParseError("Transfer-Encoding is not supported", 501)
+            if 'content-length' in headers:
+                raise HTTPParseError()
+            self.chunked = True
+
+        elif 'content-length' in headers:
+            values = {value.strip() for value in headers['content-length'].split(',')}
+            if len(values) != 1:
+                raise HTTPParseError()
+            value = values.pop()
+            if not value.isdigit():
+                raise HTTPParseError()
+            self.content_length = int(value)
+            if self.max_body_size and self.content_length > self.max_body_size:
+                raise HTTPParseError("Payload Too Large", 413)
+
+        self.keep_alive = self.http_version == 'HTTP/1.1'
+        connection = headers.get('connection')
+        if connection:
+            tokens = [token.strip() for token in connection.lower().split(',')]
+            if 'close' in tokens:
+                self.keep_alive = False
+            elif 'keep-alive' in tokens:
+                self.keep_alive = True
+
+        events.append((ParserEvent.HEADERS, headers))
+
+        if self.chunked:
+            self._state = self._CHUNK_SIZE
+            self._head_size = 0
+        elif self.content_length:
+            self._state = self._BODY
+            self._remaining = self.content_length
+        else:
+            self._complete(events)
+
+    def _parse_chunk_size(self, line):
+        size = bytes(line.split(b';', 1)[0].strip())
+        if not size or size.strip(b'0123456789abcdefABCDEF'):
+            raise HTTPParseError("Invalid chunk size")
+        size = int(size, 16)
+
+        if not size:
+            self._state = self._TRAILERS
+            return
+
+        self._received += size
+        if self.max_body_size and self._received > self.max_body_size:
+            raise HTTPParseError("Payload Too Large", 413)
+        self._state = self._CHUNK_DATA
+        self._remaining = size
+
+    def _complete(self, events: list):
+        events.append((ParserEvent.COMPLETE, self.keep_alive))
+        self._reset()
@@ -0,0 +1,451 @@
+import asyncio
+import time
+from collections import deque
+from typing import Optional
+
+from WebRestAPI.requests import HTTPRequest, RequestStream
+from WebRestAPI.response import HTTPResponse, StreamingResponse, FileStreamResponse
+from WebRestAPI.parser import HTTPParser, ParserEvent
+from WebRestAPI.multipart import MultipartParser, parse_boundary
+from WebRestAPI.exception_code import HTTPParseError, ClientDisconnectedError
+from WebRestAPI.log.log import APIlog, DEBUG
+
+MAX_PIPELINED_REQUESTS = 16
+SMALL_BODY_SIZE = 16384
+LINGER_TIMEOUT = 2
+# sendfile runs in slices so write_timeout applies to each one
+SENDFILE_SLICE = 512 * 1024
+
+
+class HTTPProtocol(asyncio.Protocol):
+    def __init__(self, server):
+        self._server = server
+        self._cfg = server.cfg
+        self._metrics = server.metrics
+        self._loop = asyncio.get_running_loop()
+        self._transport = None
+        self._addr = None
+        self._parser = HTTPParser(max_body_size=self._cfg.max_body_size)
+        self._request_line = None
+        self._headers = None
+        self._body = []
+        self._multipart = None
+        self._stream = None
+        self._stream_failed = False
+        self._pending = deque()
+        self._requests_served = 0
+        self._reading_paused = False
+        self._writing_paused = False
+        self._drain_waiter = None
+        self._closing = False
+        self._eof = False
+        self._idle = False
+        self._task = None
+        self._timeout_handle = None
+
+    def connection_made(self, transport):
+        self._transport = transport
+        self._addr = transport.get_extra_info('peername')
+        transport.set_write_buffer_limits(self._cfg.write_buffer_high, self._cfg.write_buffer_low)
+        self._server._connection_made(self)
+        if self._metrics is not None:
+            self._metrics.connections += 1
+            self._metrics.connections_total += 1
+        self._set_timeout(self._cfg.client_timeout)
+
+    def data_received(self, data: bytes):
+        if self._closing:
+            return
+
+        if self._idle:
+            self._idle = False
+            self._set_timeout(self._cfg.client_timeout)
+
+        metrics = self._metrics
+        if metrics is None:
+            self._feed(data)
+        else:
+            metrics.bytes_in += len(data)
+            started = time.perf_counter()
+            self._feed(data)
+            metrics.phases['parse'].observe(time.perf_counter() - started)
+        self._update_reading()
+
+        if self._pending and self._task is None:
+            self._set_timeout(None)
+            self._task = self._loop.create_task(self._serve())
+
+    def eof_received(self):
+        self._eof = True
+        if self._task is None and not self._pending:
+            self._close()
+        return True
+
+    def connection_lost(self, exc):
+        self._set_timeout(None)
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+        self._transport = None
+        if self._multipart is not None:
+            self._multipart.close()
+            self._multipart = None
+        if self._stream is not None:
+            self._stream.abort(ClientDisconnectedError())
+            self._stream = None
+        self._wake_drain(exc or ConnectionResetError("Connection lost"))
+        if self._metrics is not None:
+            self._metrics.connections -= 1
+        self._server._connection_lost(self)
+
+    def pause_writing(self):
+        self._writing_paused = True
+
+    def resume_writing(self):
+        self._writing_paused = False
+        self._wake_drain()
+
+    def _wake_drain(self, exc: Exception = None):
+        waiter = self._drain_waiter
+        if waiter is None or waiter.done():
+            return
+        if exc is None:
+            waiter.set_result(None)
+        else:
+            waiter.set_exception(exc)
+
+    async def _drain(self):
+        if self._transport is None:
+            raise ConnectionResetError("Connection lost")
+        if not self._writing_paused:
+            return
+        self._drain_waiter = self._loop.create_future()
+        try:
+            await asyncio.wait_for(self._drain_waiter, self._cfg.write_timeout or None)
+        except asyncio.TimeoutError:
+            # the client stopped reading; drop it instead of holding the buffered response forever
+            APIlog.error(f"Write to {self._addr} timed out after {self._cfg.write_timeout}s")
+            self.abort()
+            raise ConnectionAbortedError("Write timed out") from None
+        finally:
+            self._drain_waiter = None
+
+    def shutdown(self):
+        self._closing = True
+        if self._task is None and not self._pending:
+            self._close()
+
+    def abort(self):
+        if self._transport is not None:
+            self._transport.abort()
+
+    def _feed(self, data: bytes):
+        body_received = False
+        try:
+            events = self._parser.feed(data)
+            for event, value in events:
+                if event is ParserEvent.REQUEST_LINE:
+                    self._request_line = value
+                elif event is ParserEvent.HEADERS:
+                    self._headers = value
+                    self._start_body(value)
+                elif event is ParserEvent.BODY:
+                    body_received = True
+                    if self._stream is not None:
+                        self._stream.feed(value)
+                    elif self._multipart is not None:
+                        self._multipart.feed(value)
+                    else:
+                        self._body.append(value)
+                elif event is ParserEvent.COMPLETE:
+                    if self._stream is not None:
+                        self._stream.finish()
+                        self._stream = None
+                        self._request_line = None
+                        self._headers = None
+                    else:
+                        self._pending.append((self._build_request(), value))
+                    if not value:
+                        self._closing = True
+                        return
+                elif event is ParserEvent.ERROR:
+                    raise value
+            if body_received and self._task is None and not self._pending:
+                # client_timeout bounds the time between body reads, not the whole upload
+                self._set_timeout(self._cfg.client_timeout)
+        except HTTPParseError as e:
+            if self._multipart is not None:
+                self._multipart.close()
+                self._multipart = None
+            self._closing = True
+            if self._stream is not None:
+                self._stream.abort(e)
+                self._stream = None
+                self._stream_failed = True
+            else:
+                self._pending.append((e, False))
+
+    def _start_body(self, headers: dict):
+        parser = self._parser
+        if not parser.content_length and not parser.chunked:
+            return
+
+        if headers.get('expect', '').lower() == '100-continue' and self._task is None and not self._pending:
+            self._transport.write(b'HTTP/1.1 100 Continue\r\n\r\n')
+
+        if self._server._is_streaming(parser.method, parser.target):
+            self._stream = RequestStream(timeout=self._cfg.client_timeout, on_read=self._update_reading)
+            request = HTTPRequest.from_parts(*self._request_line, headers, stream=self._stream)
+            self._pending.append((request, parser.keep_alive))
+            return
+
+        content_type = headers.get('content-type', '')
+        if 'multipart/form-data' not in content_type:
+            return
+        boundary = parse_boundary(content_type)
+        if boundary is not None:
+            self._multipart = MultipartParser(boundary, self._cfg.max_part_size, self._cfg.multipart_spool_size)
+
+    def _build_request(self) -> HTTPRequest:
+        request = HTTPRequest.from_parts(*self._request_line, self._headers, b''.join(self._body))
+        multipart = self._multipart
+        if multipart is not None:
+            multipart.finish()
+            request.form_data = multipart.form
+            request.files = multipart.files
+        self._request_line = None
+        self._headers = None
+        self._body = []
+        self._multipart = None
+        return request
+
+    async def _serve(self):
+        try:
+            while self._pending and self._transport is not None:
+                request, keep_alive = self._pending.popleft()
+                self._requests_served += 1
+                self._update_reading()
+
+                max_requests = self._cfg.max_keep_alive_requests
+                if max_requests and self._requests_served >= max_requests:
+                    keep_alive = False
+                if self._closing and not self._pending:
+                    keep_alive = False
+
+                if isinstance(request, HTTPParseError):
+                    if self._metrics is not None:
+                        self._metrics.parse_errors[request.status_code] += 1
+                    response = HTTPResponse.PlainTextResponse(request.message, status_code=request.status_code)
+                    keep_alive = await self._respond(response, False)
+                else:
+                    if APIlog.level <= DEBUG:
+                        APIlog.debug(f"Received {request.method} {request.path} from {self._addr}")
+                    metrics = self._metrics
+                    started = None
+                    if metrics is not None or APIlog.access_log:
+                        started = time.perf_counter()
+                    if metrics is not None:
+                        metrics.in_flight += 1
+                    try:
+                        response = await self._server._handle_request(request)
+                        # shutdown() may have been called or the streamed body rejected while the handler ran
+                        if self._stream_failed or (self._closing and not self._pending):
+                            keep_alive = False
+                        keep_alive = await self._respond(response, keep_alive, request, started)
+                    finally:
+                        request.close()
+                        if metrics is not None:
+                            metrics.in_flight -= 1
+
+                if keep_alive is None:
+                    return
+
+                if not keep_alive:
+                    self._closing = True
+                    if isinstance(request, HTTPParseError) or self._stream_failed:
+                        self._linger()
+                    else:
+                        self._close()
+                    return
+
+        except Exception as e:
+            APIlog.error(f"Client error: {e}")
+            self._close()
+            return
+        finally:
+            self._task = None
+
+        if self._eof or self._closing:
+            self._close()
+        elif not self._parser.idle:
+            self._set_timeout(self._cfg.client_timeout)
+        else:
+            self._idle = True
+            self._set_timeout(self._cfg.keep_alive_timeout)
+
+    async def _respond(self, response: HTTPResponse, keep_alive: bool,
+                       request: Optional[HTTPRequest] = None, started: Optional[float] = None) -> Optional[bool]:
+        if response.status_code == 400:
+            keep_alive = False
+        if response.headers.get('Connection', '').lower() == 'close':
+            keep_alive = False
+
+        if self._transport is None or self._transport.is_closing():
+            return None
+
+        responded = time.perf_counter() if started is not None else None
+        if isinstance(response, StreamingResponse):
+            chunked = request is not None and request.http_version == 'HTTP/1.1'
+            head_only = request is not None and request.method == 'HEAD'
+            keep_alive, sent = await self._write_stream(response, keep_alive, chunked, head_only)
+        elif isinstance(response, FileStreamResponse):
+            keep_alive, sent = await self._write_file(response, keep_alive, request)
+        else:
+            buffers = response.build_buffers(keep_alive)
+            if request is not None and request.method == 'HEAD':
+                buffers = [buffers[0], b'']
+            sent = self._write(buffers)
+            await self._drain()
+        if APIlog.level <= DEBUG:
+            APIlog.debug(f"Sent {sent} bytes to {self._addr}")
+        if self._metrics is not None:
+            self._metrics.bytes_out += sent
+        if started is not None:
+            self._record(request, response, sent, started, responded)
+        return keep_alive
+
+    def _record(self, request: HTTPRequest, response: HTTPResponse, sent: int, started: float, responded: float):
+        finished = time.perf_counter()
+        if self._metrics is not None:
+            self._metrics.observe(request.method, request.route, response.status_code,
+                                  finished - started, responded - started, finished - responded)
+        if APIlog.access_log:
+            APIlog.access(request.method, request.path, request.http_version, response.status_code,
+                          sent, finished - started, self._addr)
+
+    def _write(self, buffers: list[bytes]) -> int:
+        head, body = buffers
+        if len(body) <= SMALL_BODY_SIZE:
+            self._transport.write(head + body)
+        else:
+            self._transport.write(head)
+            self._transport.write(body)
+        return len(head) + len(body)
+
+    def _update_reading(self):
+        if self._transport is None or self._transport.is_closing():
+            return
+        paused = len(self._pending) >= MAX_PIPELINED_REQUESTS or (self._stream is not None and self._stream.full)
+        if paused != self._reading_paused:
+            self._reading_paused = paused
+            if paused:
+                self._transport.pause_reading()
+            else:
+                self._transport.resume_reading()
+
+    def _linger(self):
+        # the client may still be sending the rejected body; closing now would reset the connection
+        # before it reads the error response
+        if self._eof or not self._transport.can_write_eof():
+            self._close()
+            return
+        self._transport.write_eof()
+        self._set_timeout(LINGER_TIMEOUT)
+
+    async def _write_stream(self, response: StreamingResponse, keep_alive: bool, chunked: bool,
+                            head_only: bool = False) -> tuple[bool, int]:
+        head, chunked, keep_alive = response.build_head(keep_alive, chunked)
+        self._transport.write(head)
+        sent = len(head)
+        if head_only:
+            await response.aclose()
+            return keep_alive, sent
+
+        try:
+            async for chunk in response.iterate():
+                if not chunk:
+                    continue
+                if self._transport is None or self._transport.is_closing():
+                    return False, sent
+                if chunked:
+                    self._transport.writelines((b'%x\r\n' % len(chunk), chunk, b'\r\n'))
+                else:
+                    self._transport.write(chunk)
+                sent += len(chunk)
+                await self._drain()
+        except (ConnectionError, asyncio.CancelledError):
+            raise
+        except Exception as e:
+            APIlog.error(f"Streaming response error: {e}")
+            self.abort()
+            return False, sent
+
+        if chunked:
+            self._transport.write(b'0\r\n\r\n')
+        return keep_alive, sent
+
+    async def _write_file(self, response: FileStreamResponse, keep_alive: bool,
+                          request: Optional[HTTPRequest]) -> tuple[bool, int]:
+        if response.content is not None:
+            response.prepare(request)
+            head, body = response.build_buffers(keep_alive)
+            if request is not None and request.method == 'HEAD':
+                body = b''
+            sent = self._write([head, body])
+            await self._drain()
+            return keep_alive, sent
+
+        try:
+            response.prepare(request)
+            file = open(response.path, 'rb') if response.count else None
+        except OSError as e:
+            APIlog.error(f"File response error: {e}")
+            not_found = HTTPResponse.HTMLResponse("<h1>404 Not Found</h1><p>File not found</p>", status_code=404)
+            return keep_alive, self._write(not_found.build_buffers(keep_alive))
+
+        head = response.build_head(keep_alive)
+        self._transport.write(head)
+        if file is None or (request is not None and request.method == 'HEAD'):
+            if file is not None:
+                file.close()
+            return keep_alive, len(head)
+
+        sent = 0
+        with file:
+            try:
+                while sent < response.count:
+                    count = min(response.count - sent, SENDFILE_SLICE)
+                    written = await asyncio.wait_for(
+                        self._loop.sendfile(self._transport, file, response.offset + sent, count),
+                        self._cfg.write_timeout or None
+                    )
+                    sent += written
+                    if written < count:
+                        break
+            except asyncio.TimeoutError:
+                APIlog.error(f"Write to {self._addr} timed out after {self._cfg.write_timeout}s")
+                self.abort()
+                raise ConnectionAbortedError("Write timed out") from None
+            except (ConnectionError, asyncio.CancelledError):
+                raise
+            except Exception as e:
+                APIlog.error(f"File response error: {e}")
+                self.abort()
+                return False, len(head) + sent
+        return keep_alive, len(head) + sent
+
+    def _set_timeout(self, seconds):
+        if self._timeout_handle is not None:
+            self._timeout_handle.cancel()
+            self._timeout_handle = None
+        if seconds:
+            self._timeout_handle = self._loop.call_later(seconds, self._on_timeout)
+
+    def _on_timeout(self):
+        self._timeout_handle = None
+        if self._task is None:
+            self._close()
+
+    def _close(self):
+        self._set_timeout(None)
+        if self._transport is not None and not self._transport.is_closing():
+            self._transport.close()
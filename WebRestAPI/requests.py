@@ -1,101 +1,316 @@
-import json
+import asyncio
 import urllib.parse
-import re
-from typing import Dict, Any, Optional
+from collections import deque
+from collections.abc import MutableMapping
+from types import SimpleNamespace
+from typing import Dict, Any, Optional, AsyncIterator, Callable
+from WebRestAPI.parser import HTTPParser, ParserEvent
+from WebRestAPI.multipart import MultipartParser, UploadFile, parse_boundary
+from WebRestAPI import json_codec
+from WebRestAPI.exception_code import HTTPParseError
+
+_UNSET = object()
+STREAM_HIGH_WATER = 262144
+
+
+class RequestStream:
+    def __init__(self, high_water: int = STREAM_HIGH_WATER, timeout: Optional[float] = None,
+                 on_read: Optional[Callable[[], None]] = None):
+        self.high_water = high_water
+        self.timeout = timeout
+        self._on_read = on_read
+        self._chunks = deque()
+        self._size = 0
+        self._eof = False
+        self._error = None
+        self._discard = False
+        self._waiter = None
+
+    @property
+    def full(self) -> bool:
+        return self._size >= self.high_water
+
+    @property
+    def done(self) -> bool:
+        return self._eof or self._error is not None
+
+    def feed(self, chunk: bytes):
+        if self._discard or not chunk:
+            return
+        self._chunks.append(chunk)
+        self._size += len(chunk)
+        self._wake()
+
+    def finish(self):
+        self._eof = True
+        self._wake()
+
+    def abort(self, exc: Exception):
+        self._error = exc
+        self._wake()
+
+    def discard(self):
+        self._discard = True
+        self._chunks.clear()
+        self._size = 0
+        if self._on_read is not None:
+            self._on_read()
+
+    def _wake(self):
+        waiter = self._waiter
+        if waiter is not None and not waiter.done():
+            waiter.set_result(None)
+
+    async def read_chunk(self) -> bytes:
+        while not self._chunks:
+            if self._error is not None:
+                raise self._error
+            if self._eof:
+                return b''
+            self._waiter = asyncio.get_running_loop().create_future()
+            try:
+                await asyncio.wait_for(self._waiter, self.timeout)
+            finally:
+                self._waiter = None
+
+        chunk = self._chunks.popleft()
+        self._size -= len(chunk)
+        if self._on_read is not None:
+            self._on_read()
+        return chunk
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self) -> bytes:
+        chunk = await self.read_chunk()
+        if not chunk:
+            raise StopAsyncIteration
+        return chunk
+
+
+class RequestJSON(MutableMapping):
+    _FIELDS = {
+        'method': 'method',
+        'path': 'path',
+        'http_version': 'http_version',
+        'headers': 'headers',
+        'body': 'text',
+        'json_body': 'json_body',
+        'form_data': 'form_data',
+        'files': 'files',
+        'query_params': 'query_params',
+        'path_params': 'path_params',
+    }
+
+    __slots__ = ('_request', '_extra')
+
+    def __init__(self, request: 'HTTPRequest'):
+        self._request = request
+        self._extra = {}
+
+    def __getitem__(self, key):
+        if key in self._extra:
+            return self._extra[key]
+        if key in self._FIELDS:
+            return getattr(self._request, self._FIELDS[key])
+        raise KeyError(key)
+
+    def __setitem__(self, key, value):
+        if key in self._FIELDS and key != 'body':
+            setattr(self._request, self._FIELDS[key], value)
+        else:
+            self._extra[key] = value
+
+    def __delitem__(self, key):
+        del self._extra[key]
+
+    def __iter__(self):
+        yield from self._FIELDS
+        for key in self._extra:
+            if key not in self._FIELDS:
+                yield key
+
+    def __len__(self):
+        return len(self._FIELDS) + sum(1 for key in self._extra if key not in self._FIELDS)
+
+    def copy(self) -> Dict[str, Any]:
+        return dict(self)
+
+    def __repr__(self):
+        return repr(self.copy())
 
 
 class HTTPRequest:
-    def __init__(self, raw_request: bytes):
+    __slots__ = (
+        'raw', 'method', 'path', 'http_version', 'headers', 'body', 'path_params',
+        '_query_string', '_query_params', '_json_body', '_form_data', '_files',
+        '_text', '_request_json', '_stream', '_state', 'route',
+    )
+
+    def __init__(self, raw_request: bytes = b''):
         self.raw = raw_request
         self.method = None
         self.path = None
         self.http_version = None
         self.headers = {}
         self.body = b''
-        self.json_body = None
-        self.form_data = {}
-        self.files = {}
-        self.query_params = {}
         self.path_params = {}
-        self.request_json = self._parse_request(raw_request)
+        self._query_string = ''
+        self._query_params = None
+        self._json_body = _UNSET
+        self._form_data = None
+        self._files = None
+        self._text = None
+        self._request_json = None
+        self._stream = None
+        self._state = None
+        self.route = None
+        self._parse_request(raw_request)
 
-    def _parse_request(self, raw_request: bytes) -> Dict[str, Any]:
-        try:
-            if not raw_request:
-                return {}
-
-            header_end = raw_request.find(b'\r\n\r\n')
-            if header_end == -1:
-                return {}
-
-            headers_part = raw_request[:header_end]
-            self.body = raw_request[header_end + 4:]
-
-            lines = headers_part.split(b'\r\n')
-            if not lines:
-                return {}
-
-            request_line = lines[0].decode('utf-8', errors='ignore').strip()
-            request_parts = request_line.split()
-
-            if len(request_parts) >= 3:
-                self.method = request_parts[0]
-                self.path = request_parts[1]
-                self.http_version = request_parts[2]
-            else:
-                return {}
-
-            for line in lines[1:]:
-                line = line.strip()
-                if not line:
-                    continue
-                line_str = line.decode('utf-8', errors='ignore')
-                if ': ' in line_str:
-                    key, value = line_str.split(': ', 1)
-                    self.headers[key.strip().lower()] = value.strip()
-
-            if '?' in self.path:
-                path_parts = self.path.split('?', 1)
-                self.path = path_parts[0]
-                if len(path_parts) > 1:
-                    query_string = path_parts[1]
-                    self.query_params = self._parse_query_string(query_string)
+    @classmethod
+    def from_parts(cls, method: str, target: str, http_version: str,
+                   headers: Dict[str, str], body: bytes = b'',
+                   stream: Optional[RequestStream] = None) -> 'HTTPRequest':
+        request = cls()
+        request._load(method, target, http_version, headers, body)
+        request._stream = stream
+        return request
 
-            if self.body:
-                content_type = self.headers.get('content-type', '')
-                if 'application/json' in content_type:
-                    try:
-                        body_text = self.body.decode('utf-8')
-                        if body_text.strip():
-                            self.json_body = json.loads(body_text)
-                    except:
-                        self.json_body = None
-                elif 'application/x-www-form-urlencoded' in content_type:
-                    try:
-                        body_text = self.body.decode('utf-8')
-                        self.form_data = self._parse_query_string(body_text)
-                    except:
-                        self.form_data = {}
-                elif 'multipart/form-data' in content_type:
-                    self._parse_multipart_form_data(content_type)
-
-            return {
-                'method': self.method,
-                'path': self.path,
-                'http_version': self.http_version,
-                'headers': self.headers,
-                'body': self.body.decode('utf-8', errors='ignore'),
-                'json_body': self.json_body,
-                'form_data': self.form_data,
-                'files': self.files,
-                'query_params': self.query_params,
-                'path_params': self.path_params
-            }
-
-        except Exception as e:
-            import traceback
-            traceback.print_exc()
+    @property
+    def request_json(self) -> MutableMapping:
+        if self.method is None:
             return {}
+        if self._request_json is None:
+            self._request_json = RequestJSON(self)
+        return self._request_json
+
+    @property
+    def query_string(self) -> str:
+        return self._query_string
+
+    @property
+    def query_params(self) -> Dict[str, str]:
+        if self._query_params is None:
+            self._query_params = self._parse_query_string(self._query_string) if self._query_string else {}
+        return self._query_params
+
+    @query_params.setter
+    def query_params(self, value: Dict[str, str]):
+        self._query_params = value
+
+    @property
+    def json_body(self) -> Any:
+        if self._json_body is _UNSET:
+            self._json_body = None
+            if self.body and 'application/json' in self.headers.get('content-type', ''):
+                try:
+                    if self.body.strip():
+                        self._json_body = json_codec.loads(self.body)
+                except Exception:
+                    self._json_body = None
+        return self._json_body
+
+    @json_body.setter
+    def json_body(self, value: Any):
+        self._json_body = value
+
+    @property
+    def form_data(self) -> Dict[str, str]:
+        if self._form_data is None:
+            self._parse_form()
+        return self._form_data
+
+    @form_data.setter
+    def form_data(self, value: Dict[str, str]):
+        self._form_data = value
+
+    @property
+    def files(self) -> Dict[str, UploadFile]:
+        if self._files is None:
+            self._parse_form()
+        return self._files
+
+    @files.setter
+    def files(self, value: Dict[str, UploadFile]):
+        self._files = value
+
+    @property
+    def state(self) -> SimpleNamespace:
+        # per-request storage for middleware and handlers
+        if self._state is None:
+            self._state = SimpleNamespace()
+        return self._state
+
+    @property
+    def streaming(self) -> bool:
+        return self._stream is not None
+
+    async def stream(self) -> AsyncIterator[bytes]:
+        if self._stream is None:
+            if self.body:
+                yield self.body
+            return
+        async for chunk in self._stream:
+            yield chunk
+
+    @property
+    def text(self) -> str:
+        if self._text is None:
+            self._text = self.body.decode('utf-8', errors='ignore')
+        return self._text
+
+    def _parse_request(self, raw_request: bytes):
+        if not raw_request:
+            return
+
+        events = HTTPParser().feed(raw_request)
+        request_line = None
+        headers = None
+        body = []
+        for event, value in events:
+            if event is ParserEvent.REQUEST_LINE:
+                request_line = value
+            elif event is ParserEvent.HEADERS:
+                headers = value
+            elif event is ParserEvent.BODY:
+                body.append(value)
+            elif event is ParserEvent.COMPLETE:
+                break
+            elif event is ParserEvent.ERROR:
+                return
+
+        if request_line is None or headers is None:
+            return
+
+        self._load(*request_line, headers, b''.join(body))
+
+    def _load(self, method: str, target: str, http_version: str,
+              headers: Dict[str, str], body: bytes):
+        self.method = method
+        self.path, _, self._query_string = target.partition('?')
+        self.http_version = http_version
+        self.headers = headers
+        self.body = body
+
+    def _parse_form(self):
+        if self._form_data is None:
+            self._form_data = {}
+        if self._files is None:
+            self._files = {}
+
+        if not self.body:
+            return
+
+        content_type = self.headers.get('content-type', '')
+        if 'application/x-www-form-urlencoded' in content_type:
+            try:
+                body_text = self.body.decode('utf-8')
+                self._form_data = self._parse_query_string(body_text)
+            except:
+                self._form_data = {}
+        elif 'multipart/form-data' in content_type:
+            self._parse_multipart_form_data(content_type)
 
     def _parse_query_string(self, query_string: str) -> Dict[str, str]:
         params = {}
@@ -112,44 +327,22 @@ class HTTPRequest:
         return params
 
     def _parse_multipart_form_data(self, content_type: str):
-        boundary_match = re.search(r'boundary=(.+)', content_type)
-        if not boundary_match:
+        boundary = parse_boundary(content_type)
+        if boundary is None:
             return
 
-        boundary = boundary_match.group(1).encode()
-        parts = self.body.split(b'--' + boundary)
-
-        for part in parts:
-            if not part or part == b'--\r\n':
-                continue
-
-            headers_end = part.find(b'\r\n\r\n')
-            if headers_end == -1:
-                continue
-
-            headers_part = part[:headers_end]
-            content = part[headers_end + 4:-2]
-
-            headers = {}
-            for line in headers_part.split(b'\r\n'):
-                line_str = line.decode('utf-8', errors='ignore')
-                if ': ' in line_str:
-                    key, value = line_str.split(': ', 1)
-                    headers[key.lower()] = value
-
-            content_disposition = headers.get('content-disposition', '')
-            name_match = re.search(r'name="([^"]+)"', content_disposition)
-            filename_match = re.search(r'filename="([^"]+)"', content_disposition)
-
-            if name_match:
-                name = name_match.group(1)
-                if filename_match:
-                    filename = filename_match.group(1)
-                    self.files[name] = {
-                        'filename': filename,
-                        'content': content,
-                        'content_type': headers.get('content-type', 'application/octet-stream'),
-                        'size': len(content)
-                    }
-                else:
-                    self.form_data[name] = content.decode('utf-8', errors='ignore')
\ No newline at end of file
+        parser = MultipartParser(boundary)
+        try:
+            parser.feed(self.body)
+        except HTTPParseError:
+            pass
+        self._form_data = parser.form
+        self._files = parser.files
+
+    def close(self):
+        if self._stream is not None and not self._stream.done:
+            self._stream.discard()
+        if self._files:
+            for upload in self._files.values():
+                if isinstance(upload, UploadFile):
+                    upload.close()
@@ -1,10 +1,40 @@
-import json
+import asyncio
+import email.utils
+import inspect
 import mimetypes
 import os
+import stat as stat_module
+from http import HTTPStatus
 from pathlib import Path
-from typing import Union, Dict, Any, Optional
+from typing import Union, Dict, Any, Optional, AsyncIterator, Iterable, AsyncIterable
 import WebRestAPI
-from WebRestAPI.files.files import File, FileTypes
+from WebRestAPI.files.files import FileTypes, TemplateFilePath
+from WebRestAPI.template_string.template import get_loader
+from WebRestAPI import json_codec
+
+
+STATUS_PHRASES: Dict[int, str] = {status.value: status.phrase for status in HTTPStatus}
+HEAD_CACHE_SIZE = 512
+
+_status_lines: Dict[int, bytes] = {}
+_head_cache: Dict[tuple, bytes] = {}
+_server_header: Optional[str] = None
+
+
+def status_line(status_code: int) -> bytes:
+    line = _status_lines.get(status_code)
+    if line is None:
+        phrase = STATUS_PHRASES.get(status_code, "Unknown")
+        line = f"HTTP/1.1 {status_code} {phrase}\r\n".encode('latin-1')
+        _status_lines[status_code] = line
+    return line
+
+
+def server_header() -> str:
+    global _server_header
+    if _server_header is None:
+        _server_header = f'WebRestAPI/v{WebRestAPI.__version__}'
+    return _server_header
 
 
 class HTTPResponse:
@@ -18,49 +48,54 @@ class HTTPResponse:
         if media_type and 'Content-Type' not in self.headers:
             self.headers['Content-Type'] = media_type
 
-    def build(self) -> bytes:
-        if isinstance(self.content, dict):
-            body = json.dumps(self.content, ensure_ascii=False).encode('utf-8')
-            if 'Content-Type' not in self.headers:
-                self.headers['Content-Type'] = 'application/json'
-        elif isinstance(self.content, str):
-            body = self.content.encode('utf-8')
-            if 'Content-Type' not in self.headers:
-                self.headers['Content-Type'] = 'text/html; charset=utf-8'
-        elif isinstance(self.content, bytes):
-            body = self.content
-        elif self.content is None:
-            body = b''
-        else:
-            body = str(self.content).encode('utf-8')
-            if 'Content-Type' not in self.headers:
-                self.headers['Content-Type'] = 'text/plain'
-
-        if 'Content-Length' not in self.headers:
-            self.headers['Content-Length'] = str(len(body))
+    def _encode_body(self) -> tuple[bytes, Optional[str]]:
+        content = self.content
+        if isinstance(content, bytes):
+            return content, None
+        if isinstance(content, str):
+            return content.encode('utf-8'), 'text/html; charset=utf-8'
+        if isinstance(content, dict):
+            return json_codec.dumps(content), 'application/json'
+        if content is None:
+            return b'', None
+        if self.media_type == 'application/json':
+            return json_codec.dumps(content), 'application/json'
+        return str(content).encode('utf-8'), 'text/plain'
 
-        if 'Server' not in self.headers:
-            self.headers['Server'] = f'WebRestAPI/v{WebRestAPI.__version__}'
+    def build_buffers(self, keep_alive: bool = False) -> list[bytes]:
+        body, default_type = self._encode_body()
+        headers = self.headers
+        connection = 'keep-alive' if keep_alive else 'close'
 
-        if 'Connection' not in self.headers:
-            self.headers['Connection'] = 'close'
+        if not headers or (len(headers) == 1 and 'Content-Type' in headers):
+            content_type = headers.get('Content-Type', default_type)
+            key = (self.status_code, content_type, connection)
+            prefix = _head_cache.get(key)
+            if prefix is None:
+                lines = []
+                if content_type:
+                    lines.append(f"Content-Type: {content_type}\r\n")
+                lines.append(f"Server: {server_header()}\r\nConnection: {connection}\r\nContent-Length: ")
+                prefix = status_line(self.status_code) + ''.join(lines).encode('utf-8')
+                if len(_head_cache) < HEAD_CACHE_SIZE:
+                    _head_cache[key] = prefix
+            return [prefix + b'%d\r\n\r\n' % len(body), body]
 
-        status_phrases = {
-            200: "OK",
-            201: "Created",
-            400: "Bad Request",
-            404: "Not Found",
-            500: "Internal Server Error"
-        }
-        status_text = status_phrases.get(self.status_code, "Unknown")
+        lines = [f"{k}: {v}\r\n" for k, v in headers.items()]
+        if default_type and 'Content-Type' not in headers:
+            lines.append(f"Content-Type: {default_type}\r\n")
+        if 'Content-Length' not in headers:
+            lines.append(f"Content-Length: {len(body)}\r\n")
+        if 'Server' not in headers:
+            lines.append(f"Server: {server_header()}\r\n")
+        if 'Connection' not in headers:
+            lines.append(f"Connection: {connection}\r\n")
+        lines.append("\r\n")
 
-        lines = [f"HTTP/1.1 {self.status_code} {status_text}"]
-        for k, v in self.headers.items():
-            lines.append(f"{k}: {v}")
-        lines.append('\r\n')
+        return [status_line(self.status_code) + ''.join(lines).encode('utf-8'), body]
 
-        response_str = '\r\n'.join(lines)
-        return response_str.encode('utf-8') + body
+    def build(self, keep_alive: bool = False) -> bytes:
+        return b''.join(self.build_buffers(keep_alive))
 
     @staticmethod
     async def FileResponseAsync(file_path: str, filename: str = None,
@@ -70,7 +105,13 @@ class HTTPResponse:
         if headers is None:
             headers = {}
 
-        if not os.path.exists(file_path):
+        try:
+            loop = asyncio.get_running_loop()
+            file_stat = await loop.run_in_executor(None, os.stat, file_path)
+        except OSError:
+            file_stat = None
+
+        if file_stat is None or not stat_module.S_ISREG(file_stat.st_mode):
             return HTTPResponse.HTMLResponse(
                 "<h1>404 Not Found</h1><p>File not found</p>",
                 status_code=404
@@ -90,20 +131,12 @@ class HTTPResponse:
                 filename = os.path.basename(file_path)
             headers['Content-Disposition'] = f'attachment; filename="{filename}"'
 
-        content = await File.read(file_path, "rb")
-        headers['Content-Length'] = str(len(content))
-
-        return HTTPResponse(
-            content=content,
-            status_code=200,
-            headers=headers
-        )
+        return FileStreamResponse(file_path, file_stat, headers=headers)
 
     @staticmethod
     def FileResponse(file_path: str, filename: str = None,
                      headers: Dict[str, str] = None,
                      download: bool = False) -> 'HTTPResponse':
-        import asyncio
         return asyncio.run(HTTPResponse.FileResponseAsync(file_path, filename, headers, download))
 
     @staticmethod
@@ -136,6 +169,13 @@ class HTTPResponse:
             media_type='text/html'
         )
 
+    @staticmethod
+    async def TemplateResponse(name: str, variables: Dict[str, Any] = None, status_code: int = 200,
+                               headers: Dict[str, str] = None,
+                               directory: Union[TemplateFilePath, str, None] = None) -> 'HTTPResponse':
+        content = await get_loader(directory).render(name, variables)
+        return HTTPResponse.HTMLResponse(content, status_code=status_code, headers=headers)
+
     @staticmethod
     def PlainTextResponse(content, status_code: int = 200, headers: Dict[str, str] = None):
         if headers is None:
@@ -149,4 +189,307 @@ class HTTPResponse:
             status_code=status_code,
             headers=headers,
             media_type='text/plain'
-        )
\ No newline at end of file
+        )
+
+
+class PrebuiltResponse(HTTPResponse):
+    def __init__(self, content=None, status_code: int = 200,
+                 headers: Dict[str, str] = None, media_type: str = None):
+        super().__init__(content, status_code, headers, media_type)
+        self._buffers: Dict[bool, list[bytes]] = {}
+
+    def copy(self) -> 'PrebuiltResponse':
+        return PrebuiltResponse(self.content, self.status_code, dict(self.headers))
+
+    def build_buffers(self, keep_alive: bool = False) -> list[bytes]:
+        buffers = self._buffers.get(keep_alive)
+        if buffers is None:
+            buffers = super().build_buffers(keep_alive)
+            self._buffers[keep_alive] = buffers
+        return buffers
+
+
+_STOP = object()
+
+
+class StreamingResponse(HTTPResponse):
+    def __init__(self, content: Union[Iterable, AsyncIterable], status_code: int = 200,
+                 headers: Dict[str, str] = None, media_type: str = None,
+                 content_length: Optional[int] = None):
+        super().__init__(content, status_code, headers, media_type)
+        if content_length is None and 'Content-Length' in self.headers:
+            content_length = int(self.headers['Content-Length'])
+        self.content_length = content_length
+
+    def build_head(self, keep_alive: bool = False, chunked: bool = True) -> tuple[bytes, bool, bool]:
+        headers = {k: v for k, v in self.headers.items() if k not in ('Content-Length', 'Transfer-Encoding')}
+        if self.content_length is not None:
+            headers['Content-Length'] = str(self.content_length)
+            chunked = False
+        elif chunked:
+            headers['Transfer-Encoding'] = 'chunked'
+        else:
+            keep_alive = False
+
+        lines = [f"{k}: {v}\r\n" for k, v in headers.items()]
+        if 'Content-Type' not in headers:
+            lines.append("Content-Type: application/octet-stream\r\n")
+        if 'Server' not in headers:
+            lines.append(f"Server: {server_header()}\r\n")
+        if 'Connection' not in headers:
+            lines.append(f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n")
+        lines.append("\r\n")
+
+        return status_line(self.status_code) + ''.join(lines).encode('utf-8'), chunked, keep_alive
+
+    def _encode_chunk(self, chunk: Any) -> bytes:
+        if isinstance(chunk, (bytes, bytearray, memoryview)):
+            return chunk
+        if isinstance(chunk, str):
+            return chunk.encode('utf-8')
+        return json_codec.dumps(chunk)
+
+    async def iterate(self) -> AsyncIterator[bytes]:
+        content = self.content
+        if hasattr(content, '__aiter__'):
+            try:
+                async for chunk in content:
+                    yield self._encode_chunk(chunk)
+            finally:
+                if inspect.isasyncgen(content):
+                    await content.aclose()
+            return
+
+        loop = asyncio.get_running_loop()
+        iterator = iter(content)
+        try:
+            while True:
+                chunk = await loop.run_in_executor(None, next, iterator, _STOP)
+                if chunk is _STOP:
+                    break
+                yield self._encode_chunk(chunk)
+        finally:
+            close = getattr(iterator, 'close', None)
+            if close is not None:
+                close()
+
+    async def aclose(self):
+        content = self.content
+        if inspect.isasyncgen(content):
+            await content.aclose()
+        else:
+            close = getattr(content, 'close', None)
+            if close is not None:
+                close()
+
+    def build_buffers(self, keep_alive: bool = False) -> list[bytes]:
+        raise TypeError("StreamingResponse has no fixed body; the connection writes it with iterate()")
+
+
+class ServerSentEvent:
+    __slots__ = ('data', 'event', 'id', 'retry')
+
+    def __init__(self, data: Any = None, event: str = None, id: str = None, retry: int = None):
+        self.data = data
+        self.event = event
+        self.id = id
+        self.retry = retry
+
+    def encode(self) -> bytes:
+        lines = []
+        if self.id is not None:
+            lines.append(f"id: {self.id}")
+        if self.event is not None:
+            lines.append(f"event: {self.event}")
+        if self.retry is not None:
+            lines.append(f"retry: {self.retry}")
+
+        data = self.data
+        if data is not None:
+            if isinstance(data, bytes):
+                data = data.decode('utf-8')
+            elif not isinstance(data, str):
+                data = json_codec.dumps(data).decode('utf-8')
+            lines.extend(f"data: {line}" for line in data.splitlines() or [''])
+
+        return ('\n'.join(lines) + '\n\n').encode('utf-8')
+
+
+class EventSourceResponse(StreamingResponse):
+    def __init__(self, content: Union[Iterable, AsyncIterable], status_code: int = 200,
+                 headers: Dict[str, str] = None, ping: Optional[float] = None):
+        headers = dict(headers or {})
+        headers.setdefault('Content-Type', 'text/event-stream; charset=utf-8')
+        headers.setdefault('Cache-Control', 'no-cache')
+        headers.setdefault('X-Accel-Buffering', 'no')
+        super().__init__(content, status_code, headers)
+        self.ping = ping
+
+    def _encode_chunk(self, chunk: Any) -> bytes:
+        if not isinstance(chunk, ServerSentEvent):
+            chunk = ServerSentEvent(chunk)
+        return chunk.encode()
+
+    async def iterate(self) -> AsyncIterator[bytes]:
+        events = super().iterate()
+        if not self.ping:
+            async for chunk in events:
+                yield chunk
+            return
+
+        pending = None
+        try:
+            while True:
+                if pending is None:
+                    pending = asyncio.ensure_future(events.__anext__())
+                done, _ = await asyncio.wait((pending,), timeout=self.ping)
+                if not done:
+                    yield b': ping\n\n'
+                    continue
+                try:
+                    chunk = pending.result()
+                except StopAsyncIteration:
+                    break
+                pending = None
+                yield chunk
+        finally:
+            if pending is not None and not pending.done():
+                pending.cancel()
+                await asyncio.wait((pending,))
+            await events.aclose()
+
+
+
+class FileStreamResponse(HTTPResponse):
+    def __init__(self, path: str, file_stat: os.stat_result = None, status_code: int = 200,
+                 headers: Dict[str, str] = None, media_type: str = None, content: bytes = None):
+        super().__init__(content, status_code, headers, media_type)
+        self.path = path
+        self.stat = file_stat
+        self.offset = 0
+        self.count = None
+        self._prepared = False
+
+    @property
+    def etag(self) -> str:
+        return f'"{self.stat.st_mtime_ns:x}-{self.stat.st_size:x}"'
+
+    @property
+    def last_modified(self) -> str:
+        return email.utils.formatdate(self.stat.st_mtime, usegmt=True)
+
+    def prepare(self, request=None):
+        if self._prepared:
+            return
+        self._prepared = True
+
+        if self.stat is None:
+            self.stat = os.stat(self.path)
+        size = self.stat.st_size
+        self.offset = 0
+        self.count = size
+
+        headers = self.headers
+        headers.setdefault('ETag', self.etag)
+        headers.setdefault('Last-Modified', self.last_modified)
+        headers.setdefault('Accept-Ranges', 'bytes')
+
+        if request is None or self.status_code != 200 or request.method not in ('GET', 'HEAD'):
+            return
+
+        request_headers = request.headers
+        if self._not_modified(request_headers):
+            self.status_code = 304
+            self.count = 0
+            return
+
+        range_header = request_headers.get('range')
+        if not range_header or not self._if_range(request_headers.get('if-range')):
+            return
+
+        byte_range = self._parse_range(range_header, size)
+        if byte_range is None:
+            return
+        if byte_range is False:
+            self.status_code = 416
+            self.count = 0
+            headers['Content-Range'] = f"bytes */{size}"
+            return
+
+        start, end = byte_range
+        self.status_code = 206
+        self.offset = start
+        self.count = end - start + 1
+        headers['Content-Range'] = f"bytes {start}-{end}/{size}"
+
+    def _not_modified(self, request_headers: Dict[str, str]) -> bool:
+        if_none_match = request_headers.get('if-none-match')
+        if if_none_match is not None:
+            etag = self.headers['ETag']
+            tags = {tag.strip().removeprefix('W/') for tag in if_none_match.split(',')}
+            return '*' in tags or etag in tags
+
+        if_modified_since = request_headers.get('if-modified-since')
+        if if_modified_since:
+            try:
+                since = email.utils.parsedate_to_datetime(if_modified_since).timestamp()
+            except (TypeError, ValueError):
+                return False
+            return int(self.stat.st_mtime) <= since
+        return False
+
+    def _if_range(self, if_range: Optional[str]) -> bool:
+        if if_range is None:
+            return True
+        return if_range.strip() in (self.headers['ETag'], self.headers['Last-Modified'])
+
+    @staticmethod
+    def _parse_range(value: str, size: int):
+        unit, _, ranges = value.partition('=')
+        if unit.strip().lower() != 'bytes' or ',' in ranges:
+            return None
+
+        start, sep, end = ranges.strip().partition('-')
+        if not sep:
+            return None
+        try:
+            if not start:
+                suffix = int(end)
+                if suffix <= 0:
+                    return False
+                return max(size - suffix, 0), size - 1
+            start = int(start)
+            end = int(end) if end else size - 1
+        except ValueError:
+            return None
+
+        if start >= size:
+            return False
+        if start > end:
+            return None
+        return start, min(end, size - 1)
+
+    def build_head(self, keep_alive: bool = False) -> bytes:
+        self.prepare()
+        headers = self.headers
+        lines = [f"{k}: {v}\r\n" for k, v in headers.items() if k != 'Content-Length']
+        if self.status_code != 304:
+            if 'Content-Type' not in headers:
+                lines.append("Content-Type: application/octet-stream\r\n")
+            lines.append(f"Content-Length: {self.count}\r\n")
+        if 'Server' not in headers:
+            lines.append(f"Server: {server_header()}\r\n")
+        if 'Connection' not in headers:
+            lines.append(f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n")
+        lines.append("\r\n")
+        return status_line(self.status_code) + ''.join(lines).encode('utf-8')
+
+    def build_buffers(self, keep_alive: bool = False) -> list[bytes]:
+        head = self.build_head(keep_alive)
+        if not self.count:
+            return [head, b'']
+        if self.content is not None:
+            return [head, self.content[self.offset:self.offset + self.count]]
+        with open(self.path, 'rb') as file:
+            file.seek(self.offset)
+            return [head, file.read(self.count)]
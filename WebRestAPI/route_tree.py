@@ -0,0 +1,177 @@
+import re
+from typing import Any, Callable, Dict, Optional
+
+from WebRestAPI.exception_code import InvalidUrlError
+
+PARAM_PATTERN = re.compile(r'\{(\w+)(?::(\w+))?\}')
+
+_INT = re.compile(r'-?\d+', re.ASCII)
+_FLOAT = re.compile(r'-?\d+(?:\.\d+)?', re.ASCII)
+
+# name: (regex, converter, precedence); lower precedence is tried first
+PATH_CONVERTERS: Dict[str, tuple[str, Callable[[str], Any], int]] = {
+    'int': (_INT.pattern, int, 0),
+    'float': (_FLOAT.pattern, float, 1),
+    'str': (r'[^/]+', str, 3),
+    'path': (r'.+', str, 4),
+}
+MIXED_PRECEDENCE = 2
+
+
+def get_converter(name: Optional[str]) -> tuple[str, Callable[[str], Any], int]:
+    converter = PATH_CONVERTERS.get(name or 'str')
+    if converter is None:
+        raise InvalidUrlError(f"Unknown path parameter type '{name}'.")
+    return converter
+
+
+def compile_path(path: str) -> re.Pattern:
+    pattern = []
+    last = 0
+    for match in PARAM_PATTERN.finditer(path):
+        pattern.append(re.escape(path[last:match.start()]))
+        regex = get_converter(match.group(2))[0]
+        pattern.append(f'(?P<{match.group(1)}>{regex})')
+        last = match.end()
+    pattern.append(re.escape(path[last:]))
+    return re.compile(f"^{''.join(pattern)}$")
+
+
+def path_param_names(path: str) -> list[str]:
+    return [match.group(1) for match in PARAM_PATTERN.finditer(path)]
+
+
+class _Edge:
+    __slots__ = ('spec', 'precedence', 'name', 'convert', 'regex', 'converters', 'node')
+
+    def __init__(self, spec: str):
+        self.spec = spec
+        self.node = _Node()
+        self.name = None
+        self.convert = None
+        self.regex = None
+        self.converters = None
+
+        match = PARAM_PATTERN.fullmatch(spec)
+        if match:
+            self.name = match.group(1)
+            regex, self.convert, self.precedence = get_converter(match.group(2))
+            if self.convert is not str:
+                self.regex = re.compile(regex, re.ASCII)
+        else:
+            self.precedence = MIXED_PRECEDENCE
+            self.regex = compile_path(spec)
+            self.converters = {
+                match.group(1): get_converter(match.group(2))[1]
+                for match in PARAM_PATTERN.finditer(spec)
+            }
+
+    def match(self, segment: str) -> Optional[Dict[str, Any]]:
+        if self.converters is not None:
+            match = self.regex.match(segment)
+            if match is None:
+                return None
+            return {key: self.converters[key](value) for key, value in match.groupdict().items()}
+
+        if not segment or (self.regex is not None and self.regex.fullmatch(segment) is None):
+            return None
+        return {self.name: self.convert(segment)}
+
+
+class _Node:
+    __slots__ = ('static', 'dynamic', 'catch_all', 'routes')
+
+    def __init__(self):
+        self.static: Dict[str, '_Node'] = {}
+        self.dynamic: list[_Edge] = []
+        self.catch_all: Optional[tuple[str, '_Node']] = None
+        self.routes: Dict[str, Dict] = {}
+
+
+class RouteTree:
+    def __init__(self):
+        self._root = _Node()
+        self._count = 0
+
+    def __len__(self):
+        return self._count
+
+    def add(self, method: str, path: str, route_info: Dict):
+        node = self._root
+        segments = path.split('/')[1:]
+
+        for index, segment in enumerate(segments):
+            if '{' not in segment:
+                node = node.static.setdefault(segment, _Node())
+                continue
+
+            match = PARAM_PATTERN.fullmatch(segment)
+            if match and match.group(2) == 'path':
+                if index != len(segments) - 1:
+                    raise InvalidUrlError(f"Path parameter '{segment}' must be the last segment of {path}.")
+                if node.catch_all is None:
+                    node.catch_all = (match.group(1), _Node())
+                elif node.catch_all[0] != match.group(1):
+                    raise InvalidUrlError(f"Conflicting path parameter '{segment}' in {path}.")
+                node = node.catch_all[1]
+                break
+
+            for edge in node.dynamic:
+                if edge.spec == segment:
+                    node = edge.node
+                    break
+            else:
+                edge = _Edge(segment)
+                node.dynamic.append(edge)
+                node.dynamic.sort(key=lambda item: item.precedence)
+                node = edge.node
+
+        if method not in node.routes:
+            self._count += 1
+        node.routes[method] = route_info
+
+    def match(self, method: str, path: str) -> tuple[Optional[Dict], Dict[str, Any], list[str]]:
+        segments = path.split('/')[1:]
+        params = {}
+
+        node = self._find(self._root, segments, 0, params, method)
+        if node is not None:
+            return node.routes[method], params, []
+
+        node = self._find(self._root, segments, 0, {}, None)
+        if node is not None:
+            return None, {}, sorted(node.routes)
+        return None, {}, []
+
+    def _find(self, node: _Node, segments: list[str], index: int,
+              params: Dict[str, Any], method: Optional[str]) -> Optional[_Node]:
+        if index == len(segments):
+            if method in node.routes or (method is None and node.routes):
+                return node
+            return None
+
+        segment = segments[index]
+
+        child = node.static.get(segment)
+        if child is not None:
+            found = self._find(child, segments, index + 1, params, method)
+            if found is not None:
+                return found
+
+        for edge in node.dynamic:
+            values = edge.match(segment)
+            if values is None:
+                continue
+            found = self._find(edge.node, segments, index + 1, params, method)
+            if found is not None:
+                params.update(values)
+                return found
+
+        if node.catch_all is not None:
+            name, child = node.catch_all
+            rest = '/'.join(segments[index:])
+            if rest and (method in child.routes or (method is None and child.routes)):
+                params[name] = rest
+                return child
+
+        return None
@@ -2,14 +2,61 @@ import re
 import inspect
 import functools
 from typing import Dict, Any, Callable, Union
-from WebRestAPI.files.files import File, FileTypes
+from WebRestAPI.files.files import File, FileTypes, StaticFilePath
+from WebRestAPI.static import StaticFiles
+from WebRestAPI.cache import CachePolicy, ResponseCache
+from WebRestAPI.middleware import Middleware
+from WebRestAPI.route_tree import compile_path, path_param_names
+from WebRestAPI.response import HTTPResponse
+from WebRestAPI.executors import pools, resolve_executor, EXECUTOR_LOOP
+from WebRestAPI.exception_code import InvalidExecutorError
+
+SOURCE_REQUEST = 'request'
+SOURCE_PATH = 'path'
+SOURCE_PARAMS = 'params'
+
+MISSING = object()
+
+
+def _bool(value: Any) -> bool:
+    if isinstance(value, str):
+        value = value.strip().lower()
+        if value in ('true', '1', 'yes', 'on'):
+            return True
+        if value in ('false', '0', 'no', 'off', ''):
+            return False
+        raise ValueError(value)
+    return bool(value)
+
+
+PARAM_CONVERTERS: Dict[Any, Callable[[Any], Any]] = {
+    int: int,
+    float: float,
+    bool: _bool,
+}
+
+
+def _collect_sources(request_data) -> tuple[dict, ...]:
+    # lookup order mirrors the old merge precedence: files, form, json, query
+    json_body = request_data.get('json_body')
+    return (
+        request_data.get('files') or {},
+        request_data.get('form_data') or {},
+        json_body if isinstance(json_body, dict) else {},
+        request_data.get('query_params') or {},
+    )
 
 
 class Router:
-    def __init__(self, prefix: str = "/"):
+    def __init__(self, prefix: str = "/", middleware: list[Middleware] | None = None):
         self._prefix: str = prefix.rstrip('/')
         self._routes: Dict[str, Dict] = {}
         self._path_patterns: list = []
+        self.middleware: list[Middleware] = list(middleware or [])
+
+    def add_middleware(self, middleware: Middleware) -> Middleware:
+        self.middleware.append(middleware)
+        return middleware
 
     def _build_full_path(self, url: str) -> str:
         url = url.lstrip('/')
@@ -25,82 +72,101 @@ class Router:
                 return "/"
 
     def _parse_path_pattern(self, path: str) -> re.Pattern:
-        pattern = re.sub(r'\{(\w+)\}', r'(?P<\1>[^/]+)', path)
-        return re.compile(f'^{pattern}$')
+        return compile_path(path)
+
+    def _build_binding_plan(self, func: Callable, path: str) -> list[tuple]:
+        try:
+            sig = inspect.signature(func, eval_str=True)
+        except (NameError, TypeError):
+            sig = inspect.signature(func)
+        path_names = set(path_param_names(path))
+
+        plan = []
+        for name, param in sig.parameters.items():
+            if param.kind in (inspect.Parameter.VAR_POSITIONAL, inspect.Parameter.VAR_KEYWORD):
+                continue
+
+            if name == 'request':
+                source = SOURCE_REQUEST
+            elif param.annotation is FileTypes:
+                continue
+            elif name in path_names:
+                source = SOURCE_PATH
+            else:
+                source = SOURCE_PARAMS
+
+            converter = PARAM_CONVERTERS.get(param.annotation)
+            required = param.default is inspect.Parameter.empty
+            plan.append((name, source, converter, param.default, required))
+
+        return plan
 
-    def _create_handler_wrapper(self, func: Callable, method: str, path: str) -> Callable:
-        sig = inspect.signature(func)
-        param_names = list(sig.parameters.keys())
+    def _create_handler_wrapper(self, func: Callable, method: str, path: str,
+                                executor: str = EXECUTOR_LOOP) -> Callable:
+        plan = self._build_binding_plan(func, path)
 
         @functools.wraps(func)
         async def wrapper(request):
             kwargs = {}
+            errors = []
             request_data = getattr(request, 'request_json', {})
+            sources = None
 
-            query_params = request_data.get('query_params', {})
-            json_body = request_data.get('json_body', {})
-            form_data = request_data.get('form_data', {})
-            files = request_data.get('files', {})
-            path_params = request_data.get('path_params', {})
-
-            all_params = {}
-            if query_params:
-                all_params.update(query_params)
-            if json_body:
-                all_params.update(json_body)
-            if form_data:
-                all_params.update(form_data)
-            if path_params:
-                all_params.update(path_params)
-
-            for param_name in param_names:
-                if param_name == 'request':
-                    kwargs['request'] = request
+            for name, source, converter, default, required in plan:
+                if source is SOURCE_REQUEST:
+                    kwargs[name] = request
                     continue
 
-                if param_name in files:
-                    file_data = files[param_name]
-                    kwargs[param_name] = file_data
-                    continue
-
-                if param_name in all_params:
-                    param_value = all_params[param_name]
-                elif param_name in sig.parameters:
-                    param = sig.parameters[param_name]
-                    if param.default != inspect.Parameter.empty:
-                        param_value = param.default
-                    else:
-                        continue
+                if source is SOURCE_PATH:
+                    value = request_data.get('path_params', {}).get(name, MISSING)
                 else:
+                    if sources is None:
+                        sources = _collect_sources(request_data)
+                    value = MISSING
+                    for index, values in enumerate(sources):
+                        if name in values:
+                            value = values[name]
+                            if index == 0:
+                                converter = None
+                            break
+
+                if value is MISSING:
+                    if required:
+                        errors.append({'field': name, 'source': source, 'message': 'field required'})
+                    else:
+                        kwargs[name] = default
                     continue
 
-                if param_name in func.__annotations__:
-                    annotation = func.__annotations__[param_name]
+                if converter is not None:
                     try:
-                        if annotation == int:
-                            param_value = int(param_value)
-                        elif annotation == float:
-                            param_value = float(param_value)
-                        elif annotation == bool:
-                            if isinstance(param_value, str):
-                                param_value = param_value.lower() in ['true', '1', 'yes', 'on']
-                            else:
-                                param_value = bool(param_value)
-                        elif annotation == FileTypes:
-                            continue
-                    except:
-                        pass
-
-                kwargs[param_name] = param_value
-
-            result = await func(**kwargs)
-            return result
+                        value = converter(value)
+                    except (TypeError, ValueError):
+                        errors.append({
+                            'field': name,
+                            'source': source,
+                            'message': f"value is not a valid {converter.__name__.lstrip('_')}"
+                        })
+                        continue
+
+                kwargs[name] = value
+
+            if errors:
+                return HTTPResponse.JSONResponse({'detail': errors}, status_code=422)
+
+            if executor == EXECUTOR_LOOP:
+                return await func(**kwargs)
+            return await pools.get(executor).run(func, kwargs)
 
         return wrapper
 
-    def _register_route(self, method: str, url: str, func: Callable) -> Callable:
+    def _register_route(self, method: str, url: str, func: Callable, executor: str | None = None,
+                        stream: bool = False, cache: CachePolicy | None = None) -> Callable:
         full_path = self._build_full_path(url)
-        wrapper = self._create_handler_wrapper(func, method, full_path)
+        executor = resolve_executor(func, executor)
+        if stream and executor != EXECUTOR_LOOP:
+            raise InvalidExecutorError(f"Streaming handler {func.__qualname__} must be async to run on the event loop.")
+        wrapper = self._create_handler_wrapper(func, method, full_path, executor)
+        response_cache = ResponseCache(cache) if cache is not None else None
 
         if '{' in full_path:
             self._path_patterns.append({
@@ -108,7 +174,10 @@ class Router:
                 'handler': wrapper,
                 'original': func,
                 'method': method,
-                'path': full_path
+                'path': full_path,
+                'executor': executor,
+                'stream': stream,
+                'cache': response_cache
             })
         else:
             route_key = f"{method} {full_path}"
@@ -116,40 +185,53 @@ class Router:
                 'handler': wrapper,
                 'original': func,
                 'method': method,
-                'path': full_path
+                'path': full_path,
+                'executor': executor,
+                'stream': stream,
+                'cache': response_cache
             }
         return wrapper
 
-    def get(self, url: str):
+    def get(self, url: str, executor: str | None = None, stream: bool = False, cache: CachePolicy | None = None):
         def decorator(func: Callable):
-            return self._register_route("GET", url, func)
+            return self._register_route("GET", url, func, executor=executor, stream=stream, cache=cache)
 
         return decorator
 
-    def post(self, url: str):
+    def post(self, url: str, executor: str | None = None, stream: bool = False):
         def decorator(func: Callable):
-            return self._register_route("POST", url, func)
+            return self._register_route("POST", url, func, executor=executor, stream=stream)
 
         return decorator
 
-    def delete(self, url: str):
+    def delete(self, url: str, executor: str | None = None, stream: bool = False):
         def decorator(func: Callable):
-            return self._register_route("DELETE", url, func)
+            return self._register_route("DELETE", url, func, executor=executor, stream=stream)
 
         return decorator
 
-    def put(self, url: str):
+    def put(self, url: str, executor: str | None = None, stream: bool = False):
         def decorator(func: Callable):
-            return self._register_route("PUT", url, func)
+            return self._register_route("PUT", url, func, executor=executor, stream=stream)
 
         return decorator
 
-    def patch(self, url: str):
+    def patch(self, url: str, executor: str | None = None, stream: bool = False):
         def decorator(func: Callable):
-            return self._register_route("PATCH", url, func)
+            return self._register_route("PATCH", url, func, executor=executor, stream=stream)
 
         return decorator
 
+    def mount_static(self, url: str, directory: Union[StaticFilePath, str], **options) -> StaticFiles:
+        static = StaticFiles(directory, **options)
+
+        async def static_handler(request, path: str):
+            return await static.serve(request, path)
+
+        static_handler.__qualname__ = f"static:{url}"
+        self._register_route("GET", f"{url.rstrip('/')}/{{path:path}}", static_handler)
+        return static
+
     def get_urls(self) -> Dict[str, Dict]:
         return self._routes
 
@@ -1,229 +1,367 @@
 from pathlib import Path
 from WebRestAPI.requests import HTTPRequest
 from WebRestAPI.configurate import APIConfiguration
-from WebRestAPI.response import HTTPResponse
-from WebRestAPI.log.log import APIlog
-from WebRestAPI.files.files import File, FileTypes
+from WebRestAPI.response import HTTPResponse, StreamingResponse
+from WebRestAPI.log.log import APIlog, DEBUG, INFO
+from WebRestAPI.files.files import FileTypes
+from WebRestAPI.protocol import HTTPProtocol
+from WebRestAPI.route_tree import RouteTree
+from WebRestAPI.executors import pools
+from WebRestAPI import json_codec
+from WebRestAPI.compression import Compressor
+from WebRestAPI.assets import AssetCache
+from WebRestAPI.middleware import compose
+from WebRestAPI.asgi import ASGIApp
+from WebRestAPI.metrics import Metrics, CONTENT_TYPE as METRICS_CONTENT_TYPE
+from WebRestAPI.routes import Router
+from WebRestAPI.supervisor import Supervisor
+from WebRestAPI.exception_code import InvalidIPversionError, InvalidProtocolError, HTTPParseError
 
 import socket
+import signal
 import asyncio
+import inspect
 import sys
-import time
+import traceback
 
 
 class APIServer:
     def __init__(self, cfg: APIConfiguration):
         self.cfg = cfg
         self._socket = None
+        self._server = None
         self._routes = {}
         self._path_routes = []
+        self._route_tree = RouteTree()
+        self._has_streaming_routes = False
+        self._compressor = None
+        self.assets = AssetCache()
+        self._fallback = None
+        self._asset_pipeline = None
+        self._asgi = None
+        self.metrics = None
         self._running = False
+        self._draining = False
+        self._connections = set()
+        self._drained = asyncio.Event()
+
+    def serve(self, workers: int = 1):
+        if workers > 1:
+            Supervisor(self, workers).run()
+        else:
+            asyncio.run(self._run_worker())
+
+    async def _run_worker(self):
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGTERM, signal.SIGINT):
+            try:
+                loop.add_signal_handler(sig, self.stop)
+            except (NotImplementedError, RuntimeError, AttributeError):
+                pass
+        return await self.run()
+
+    async def run(self) -> bool:
+        loop = asyncio.get_running_loop()
 
-    async def run(self):
         try:
-            self._socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-            self._socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
-            self._socket.setblocking(self.cfg.setblocking)
-            self._socket.bind((self.cfg.host, self.cfg.port))
-            self._socket.listen(self.cfg.queue)
+            self._socket = self._create_socket()
+            codec = self._prepare()
+            if self.metrics is not None:
+                self.metrics.socket = self._socket
+            self._server = await loop.create_server(
+                lambda: HTTPProtocol(self),
+                sock=self._socket,
+                backlog=self.cfg.queue,
+                start_serving=False
+            )
 
             APIlog.log(f"Server bound to {self.cfg.host}:{self.cfg.port}")
 
-        except OSError as e:
+        except (OSError, ValueError, InvalidIPversionError, InvalidProtocolError) as e:
             APIlog.error(f"Error binding to {self.cfg.host}:{self.cfg.port}: {e}")
-            return
+            if self._socket:
+                self._socket.close()
+            return False
 
-        self._load_routes()
+        pools.configure(self.cfg.thread_pool_size, self.cfg.process_pool_size)
         APIlog.log(f"Server started on http://{self.cfg.host}:{self.cfg.port}")
+        APIlog.debug(f"JSON codec: {codec.name}")
         self._running = True
+        self._draining = False
 
         try:
-            while self._running:
-                try:
-                    if self.cfg.setblocking:
-                        client_socket, addr = self._socket.accept()
-                    else:
-                        try:
-                            client_socket, addr = self._socket.accept()
-                        except BlockingIOError:
-                            await asyncio.sleep(0.01)
-                            continue
-
-                    client_socket.settimeout(self.cfg.client_timeout)
-                    client_socket.setblocking(False)
-                    asyncio.create_task(self._handle_client(client_socket, addr))
-
-                except socket.timeout:
-                    continue
-                except OSError as e:
-                    if e.errno == socket.EBADF:
-                        break
-                    await asyncio.sleep(0.1)
-                except KeyboardInterrupt:
-                    break
-                except Exception as e:
-                    APIlog.error(f"Accept error: {e}")
-                    await asyncio.sleep(0.1)
-
-        except KeyboardInterrupt:
-            APIlog.log("Server stopped by user")
+            await self._server.serve_forever()
+        except (KeyboardInterrupt, asyncio.CancelledError):
+            if not self._draining:
+                APIlog.log("Server stopped by user")
         finally:
             self._running = False
-            if self._socket:
-                self._socket.close()
+            self._server.close()
+            await self._drain()
+            pools.shutdown(wait=False)
+        return True
+
+    def _prepare(self) -> json_codec.JSONCodec:
+        self._configure_logging()
+        self.metrics = Metrics() if self.cfg.metrics else None
+        codec = json_codec.set_codec(self.cfg.json_codec)
+        self._compressor = self._create_compressor()
+        self._register_assets()
+        self._load_routes()
+        return codec
+
+    def _configure_logging(self):
+        level = self.cfg.log_level
+        if level is None:
+            level = DEBUG if self.cfg.debug else INFO
+        APIlog.configure(level=level, json_lines=self.cfg.json_logs, access_log=self.cfg.access_log)
+
+    @property
+    def asgi(self) -> ASGIApp:
+        if self._asgi is None:
+            self._asgi = ASGIApp(self)
+        return self._asgi
+
+    def stop(self):
+        if not self._running or self._draining:
+            return
+        self._draining = True
+        APIlog.log("Server is shutting down, draining in-flight requests")
+        self._server.close()
 
-    async def _handle_client(self, client_socket, addr):
-        try:
-            loop = asyncio.get_event_loop()
-            request_data = b''
-            start_time = time.time()
-
-            while time.time() - start_time < self.cfg.client_timeout:
-                try:
-                    chunk = await loop.sock_recv(client_socket, self.cfg.read_request_byte_size)
-                    if not chunk:
-                        break
-                    request_data += chunk
-                    if b'\r\n\r\n' in request_data:
-                        content_length = self._get_content_length(request_data)
-                        body_start = request_data.find(b'\r\n\r\n') + 4
-                        if len(request_data) >= body_start + content_length:
-                            break
-                except BlockingIOError:
-                    if request_data:
-                        break
-                    await asyncio.sleep(0.001)
-                except socket.timeout:
-                    break
-                except Exception as e:
-                    break
-
-            if not request_data:
-                client_socket.close()
-                return
-
-            APIlog.debug(f"Received {len(request_data)} bytes from {addr}")
-            response_data = await self._process_request(request_data)
-
-            if response_data:
-                try:
-                    total_sent = 0
-                    while total_sent < len(response_data):
-                        sent = client_socket.send(response_data[total_sent:])
-                        if sent == 0:
-                            break
-                        total_sent += sent
-                    APIlog.debug(f"Sent {total_sent} bytes to {addr}")
-                except Exception as e:
-                    APIlog.error(f"Send error to {addr}: {e}")
+    async def _drain(self):
+        self._draining = True
+        for connection in list(self._connections):
+            connection.shutdown()
 
-        except Exception as e:
-            APIlog.error(f"Client error: {e}")
-        finally:
+        if self._connections:
+            self._drained.clear()
             try:
-                client_socket.close()
-            except:
-                pass
-
-    def _get_content_length(self, request_data: bytes) -> int:
+                await asyncio.wait_for(self._drained.wait(), self.cfg.graceful_timeout)
+            except asyncio.TimeoutError:
+                APIlog.error(f"Closing {len(self._connections)} connection(s) after graceful timeout")
+                for connection in list(self._connections):
+                    connection.abort()
+
+    def _connection_made(self, connection: HTTPProtocol):
+        self._connections.add(connection)
+
+    def _connection_lost(self, connection: HTTPProtocol):
+        self._connections.discard(connection)
+        if self._draining and not self._connections:
+            self._drained.set()
+
+    def _create_socket(self) -> socket.socket:
+        if self.cfg.fileno is not None:
+            sock = socket.socket(fileno=self.cfg.fileno)
+            sock.setblocking(False)
+            return sock
+
+        if self.cfg.IPv == "IPv4":
+            family = socket.AF_INET
+        elif self.cfg.IPv == "IPv6":
+            family = socket.AF_INET6
+        else:
+            raise InvalidIPversionError()
+
+        if self.cfg.protocol != "TCP":
+            raise InvalidProtocolError("Invalid protocol error. HTTP server supports only TCP.")
+
+        sock = socket.socket(family, socket.SOCK_STREAM, self.cfg.protocol_number)
         try:
-            headers_part = request_data.split(b'\r\n\r\n')[0]
-            lines = headers_part.split(b'\r\n')
-            for line in lines:
-                if line.lower().startswith(b'content-length:'):
-                    return int(line.split(b':')[1].strip())
-        except:
-            pass
-        return 0
-
-    async def _process_request(self, request_data):
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+            if self.cfg.reuse_port:
+                sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+            sock.setblocking(False)
+            sock.bind((self.cfg.host, self.cfg.port))
+        except OSError:
+            sock.close()
+            raise
+        return sock
+
+    async def _handle_request(self, request: HTTPRequest) -> HTTPResponse:
         try:
-            request = HTTPRequest(request_data)
             req = request.request_json
 
             if not req:
-                return HTTPResponse.PlainTextResponse("Bad Request", status_code=400).build()
+                return HTTPResponse.PlainTextResponse("Bad Request", status_code=400)
 
             method = req.get("method", "").upper()
             path = req.get("path", "")
 
-            APIlog.debug(f"Processing {method} {path}")
-
-            if not self.cfg.user_favicon and path == "/favicon.ico":
-                return await self._handle_favicon()
-
-            route_key = f"{method} {path}"
-            route_info = None
-            path_params = {}
-
-            if route_key in self._routes:
-                route_info = self._routes[route_key]
-            else:
-                for pattern_info in self._path_routes:
-                    if pattern_info['method'] == method:
-                        match = pattern_info['pattern'].match(path)
-                        if match:
-                            route_info = pattern_info
-                            path_params = match.groupdict()
-                            req['path_params'] = path_params
-                            break
-
-            if not route_info:
-                return HTTPResponse.HTMLResponse(
-                    f"<h1>404 Not Found</h1><p>Route {path} not found</p>",
-                    status_code=404
-                ).build()
-
-            handler = route_info['handler']
-            response = await handler(request)
-
-            if isinstance(response, HTTPResponse):
-                return response.build()
-            elif isinstance(response, dict):
-                return HTTPResponse.JSONResponse(response).build()
-            elif isinstance(response, str):
-                return HTTPResponse.HTMLResponse(response).build()
-            else:
-                return HTTPResponse.JSONResponse({"result": response}).build()
-
+            if APIlog.level <= DEBUG:
+                APIlog.debug(f"Processing {method} {path}")
+
+            if self.assets and (method == "GET" or method == "HEAD"):
+                if self._asset_pipeline is None:
+                    asset = self.assets.get(path, request.headers)
+                    if asset is not None:
+                        request.route = path
+                        return asset
+                elif path in self.assets:
+                    request.route = path
+                    return self._to_response(await self._asset_pipeline(request))
+
+            route_info, path_params, allowed = self._match_route(method, path)
+
+            if route_info is None:
+                if self._fallback is not None:
+                    return self._to_response(await self._fallback(request))
+                return self._no_route(method, path, allowed)
+
+            request.route = route_info['path']
+            if path_params:
+                req['path_params'] = path_params
+
+            pipeline = route_info.get('pipeline')
+            if pipeline is not None:
+                return self._to_response(await pipeline(request))
+            return await self._endpoint(route_info, request)
+
+        except HTTPParseError as e:
+            return HTTPResponse.PlainTextResponse(e.message, status_code=e.status_code)
         except Exception as e:
-            APIlog.error(f"Process error: {e}")
-            import traceback
-            traceback.print_exc()
+            APIlog.error(f"Process error: {e}\n{traceback.format_exc().rstrip()}")
             return HTTPResponse.JSONResponse(
                 {"error": "Internal Server Error"},
                 status_code=500
-            ).build()
-
-    async def _handle_favicon(self):
-        favicon_path = Path(__file__).resolve().parent / "favicon.ico"
-
-        try:
-            favicon_data = await File.read(str(favicon_path), "rb")
-        except:
-            favicon_data = b''
-
-        response = HTTPResponse(
-            content=favicon_data,
-            status_code=200,
-            headers={
-                'Content-Type': 'image/x-icon',
-                'Cache-Control': 'public, max-age=86400'
-            }
+            )
+
+    def _no_route(self, method: str, path: str, allowed: list) -> HTTPResponse:
+        if allowed:
+            return HTTPResponse.HTMLResponse(
+                f"<h1>405 Method Not Allowed</h1><p>Method {method} not allowed for {path}</p>",
+                status_code=405,
+                headers={'Allow': ', '.join(allowed)}
+            )
+        return HTTPResponse.HTMLResponse(
+            f"<h1>404 Not Found</h1><p>Route {path} not found</p>",
+            status_code=404
         )
-        return response.build()
+
+    async def _asset_endpoint(self, request: HTTPRequest) -> HTTPResponse:
+        asset = self.assets.get(request.path, request.headers)
+        if asset is None:
+            return await self._fallback_endpoint(request)
+        # middleware may change headers, so it gets a copy instead of the shared response
+        return asset.copy()
+
+    async def _fallback_endpoint(self, request: HTTPRequest) -> HTTPResponse:
+        method = (request.method or "").upper()
+        return self._no_route(method, request.path, self._match_route(method, request.path)[2])
+
+    async def _endpoint(self, route_info: dict, request: HTTPRequest) -> HTTPResponse:
+        cache = route_info.get('cache')
+        if cache is not None:
+            variant = None
+            if self._compressor is not None:
+                variant = self._compressor.negotiate(request.headers.get('accept-encoding', ''))
+            return await cache.fetch(request, lambda: self._dispatch(route_info, request), variant)
+        return await self._dispatch(route_info, request)
+
+    def _build_pipeline(self, route_info: dict, middleware: list):
+        if not middleware:
+            return None
+        if route_info.get('cache') is not None:
+            route_info['cache'].copy_responses = True
+
+        async def endpoint(request):
+            return await self._endpoint(route_info, request)
+
+        return compose(endpoint, middleware)
+
+    async def _dispatch(self, route_info: dict, request: HTTPRequest) -> HTTPResponse:
+        response = self._to_response(await route_info['handler'](request))
+        if self._compressor is not None:
+            response = await self._compressor.apply(request, response)
+        return response
+
+    def _to_response(self, result) -> HTTPResponse:
+        if isinstance(result, HTTPResponse):
+            return result
+        elif isinstance(result, dict):
+            return HTTPResponse.JSONResponse(result)
+        elif inspect.isgenerator(result) or inspect.isasyncgen(result):
+            return StreamingResponse(result)
+        elif isinstance(result, str):
+            return HTTPResponse.HTMLResponse(result)
+        else:
+            return HTTPResponse.JSONResponse({"result": result})
+
+    def _create_compressor(self):
+        compression = self.cfg.compression
+        if compression is True:
+            return Compressor()
+        return compression or None
+
+    def _match_route(self, method: str, path: str) -> tuple:
+        route_info = self._routes.get(f"{method} {path}")
+        if route_info is not None:
+            return route_info, {}, []
+        route_info, path_params, allowed = self._route_tree.match(method, path)
+        if route_info is None and method == "HEAD":
+            # GET routes answer HEAD; the connection drops the body
+            fallback = self._match_route("GET", path)
+            if fallback[0] is not None:
+                return fallback
+        if "GET" in allowed and "HEAD" not in allowed:
+            allowed = sorted(allowed + ["HEAD"])
+        return route_info, path_params, allowed
+
+    def _is_streaming(self, method: str, target: str) -> bool:
+        if not self._has_streaming_routes:
+            return False
+        route_info = self._match_route(method.upper(), target.partition('?')[0])[0]
+        return route_info is not None and route_info.get('stream', False)
+
+    def _register_assets(self):
+        if not self.cfg.user_favicon and "/favicon.ico" not in self.assets:
+            self.assets.register(
+                "/favicon.ico",
+                file=str(Path(__file__).resolve().parent / "favicon.ico"),
+                content_type='image/x-icon'
+            )
+
+    async def _metrics_endpoint(self, request: HTTPRequest) -> HTTPResponse:
+        return HTTPResponse(self.metrics.render(), headers={'Content-Type': METRICS_CONTENT_TYPE})
+
+    def executor_stats(self) -> dict:
+        return pools.stats()
+
+    def cache_stats(self) -> dict:
+        return {
+            f"{route_info['method']} {route_info['path']}": route_info['cache'].stats()
+            for route_info in list(self._routes.values()) + self._path_routes
+            if route_info.get('cache') is not None
+        }
 
     def _load_routes(self):
-        if not self.cfg.routes:
+        if self.cfg.middleware:
+            self._fallback = compose(self._fallback_endpoint, self.cfg.middleware)
+            self._asset_pipeline = compose(self._asset_endpoint, self.cfg.middleware)
+
+        routers = list(self.cfg.routes or [])
+        if self.metrics is not None and self.cfg.metrics_path:
+            metrics_router = Router()
+            metrics_router.get(self.cfg.metrics_path)(self._metrics_endpoint)
+            routers.append(metrics_router)
+
+        if not routers:
             return
 
-        for router in self.cfg.routes:
+        for router in routers:
             routes_dict = router.get_urls()
             self._routes.update(routes_dict)
 
             path_patterns = router.get_path_patterns()
             self._path_routes.extend(path_patterns)
 
+            for route_info in list(routes_dict.values()) + path_patterns:
+                self._route_tree.add(route_info['method'], route_info['path'], route_info)
+                route_info['pipeline'] = self._build_pipeline(route_info, self.cfg.middleware + router.middleware)
+                if route_info.get('stream'):
+                    self._has_streaming_routes = True
+
         APIlog.log(f"Loaded {len(self._routes)} route(s) and {len(self._path_routes)} path route(s)")
 
         if self.cfg.debug:
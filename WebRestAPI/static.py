@@ -0,0 +1,135 @@
+import asyncio
+import mimetypes
+import os
+import stat as stat_module
+import urllib.parse
+from collections import OrderedDict
+from typing import Optional, Union
+
+from WebRestAPI.files.files import StaticFilePath
+from WebRestAPI.response import HTTPResponse, FileStreamResponse
+from WebRestAPI.compression import parse_accept_encoding
+
+CACHE_SIZE = 32 * 1024 * 1024
+MAX_CACHED_FILE_SIZE = 256 * 1024
+
+# suffix, Content-Encoding token; tried in order
+PRECOMPRESSED = (('.br', 'br'), ('.gz', 'gzip'))
+
+
+def _read_file(path: str) -> bytes:
+    with open(path, 'rb') as file:
+        return file.read()
+
+
+class FileCache:
+    def __init__(self, max_size: int = CACHE_SIZE, max_file_size: int = MAX_CACHED_FILE_SIZE):
+        self.max_size = max_size
+        self.max_file_size = max_file_size
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[tuple, bytes] = OrderedDict()
+
+    async def get(self, path: str, file_stat: os.stat_result) -> Optional[bytes]:
+        if file_stat.st_size > self.max_file_size:
+            return None
+
+        key = (path, file_stat.st_mtime_ns, file_stat.st_size)
+        content = self._entries.get(key)
+        if content is not None:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return content
+
+        self.misses += 1
+        content = await asyncio.get_running_loop().run_in_executor(None, _read_file, path)
+        if len(content) != file_stat.st_size:
+            return None
+
+        self._entries[key] = content
+        self.size += len(content)
+        while self.size > self.max_size and self._entries:
+            _, evicted = self._entries.popitem(last=False)
+            self.size -= len(evicted)
+        return content
+
+    def clear(self):
+        self._entries.clear()
+        self.size = 0
+
+
+class StaticFiles:
+    def __init__(self, directory: Union[StaticFilePath, str], cache_size: int = CACHE_SIZE,
+                 max_cached_file_size: int = MAX_CACHED_FILE_SIZE, precompressed: bool = True,
+                 cache_control: Optional[str] = None):
+        self.directory = os.path.realpath(str(directory))
+        self.precompressed = precompressed
+        self.cache_control = cache_control
+        self.cache = FileCache(cache_size, max_cached_file_size) if cache_size else None
+
+    def resolve(self, path: str) -> Optional[str]:
+        path = urllib.parse.unquote(path)
+        if '\x00' in path or '\\' in path:
+            return None
+
+        parts = [part for part in path.split('/') if part not in ('', '.')]
+        if '..' in parts:
+            return None
+
+        full_path = os.path.realpath(os.path.join(self.directory, *parts))
+        if os.path.commonpath((self.directory, full_path)) != self.directory:
+            return None
+        return full_path
+
+    def _stat(self, path: str) -> Optional[os.stat_result]:
+        try:
+            file_stat = os.stat(path)
+        except OSError:
+            return None
+        return file_stat if stat_module.S_ISREG(file_stat.st_mode) else None
+
+    def _select_variant(self, full_path: str, accept_encoding: str):
+        if self.precompressed and accept_encoding:
+            accepted = parse_accept_encoding(accept_encoding)
+            for suffix, encoding in PRECOMPRESSED:
+                if accepted.get(encoding, 0) > 0:
+                    file_stat = self._stat(full_path + suffix)
+                    if file_stat is not None:
+                        return full_path + suffix, file_stat, encoding
+        return full_path, self._stat(full_path), None
+
+    def _locate(self, path: str, accept_encoding: str) -> Optional[tuple]:
+        full_path = self.resolve(path)
+        if full_path is None:
+            return None
+        file_path, file_stat, encoding = self._select_variant(full_path, accept_encoding)
+        if file_stat is None:
+            return None
+        return full_path, file_path, file_stat, encoding
+
+    async def serve(self, request, path: str) -> HTTPResponse:
+        accept_encoding = request.headers.get('accept-encoding', '') if request is not None else ''
+        # resolving and stat-ing touch the disk, so they run off the event loop like FileResponseAsync
+        located = await asyncio.get_running_loop().run_in_executor(None, self._locate, path, accept_encoding)
+        if located is None:
+            return HTTPResponse.HTMLResponse("<h1>404 Not Found</h1><p>File not found</p>", status_code=404)
+        full_path, file_path, file_stat, encoding = located
+
+        media_type, _ = mimetypes.guess_type(full_path)
+        headers = {'Content-Type': media_type or 'application/octet-stream'}
+        if self.precompressed:
+            headers['Vary'] = 'Accept-Encoding'
+        if encoding is not None:
+            headers['Content-Encoding'] = encoding
+        if self.cache_control:
+            headers['Cache-Control'] = self.cache_control
+
+        content = None
+        if self.cache is not None:
+            try:
+                content = await self.cache.get(file_path, file_stat)
+            except OSError:
+                return HTTPResponse.HTMLResponse("<h1>404 Not Found</h1><p>File not found</p>", status_code=404)
+
+        return FileStreamResponse(file_path, file_stat, headers=headers, content=content)
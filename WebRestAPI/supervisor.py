@@ -0,0 +1,186 @@
+import asyncio
+import os
+import signal
+import socket
+import sys
+import time
+from collections import deque
+
+from WebRestAPI.log.log import APIlog
+from WebRestAPI.exception_code import InvalidIPversionError, InvalidProtocolError
+
+RESTART_DELAY = 1.0
+POLL_INTERVAL = 0.2
+# a worker that cannot bind exits with this status; restarting it would only fail the same way
+BIND_FAILED_EXIT = 3
+MAX_RESTARTS = 5
+RESTART_WINDOW = 60.0
+
+
+class Supervisor:
+    def __init__(self, server, workers: int):
+        self._server = server
+        self._cfg = server.cfg
+        self._workers_count = workers
+        self._workers: dict[int, float] = {}
+        self._retiring: set[int] = set()
+        self._socket = None
+        self._stopping = False
+        self._reloading = False
+        self._restarts: deque[float] = deque()
+
+    def run(self):
+        if not hasattr(os, 'fork'):
+            APIlog.error("Worker mode requires os.fork, running a single process")
+            asyncio.run(self._server._run_worker())
+            return
+
+        if not self._prepare_listener():
+            return
+
+        signal.signal(signal.SIGTERM, self._on_stop)
+        signal.signal(signal.SIGINT, self._on_stop)
+        if hasattr(signal, 'SIGHUP'):
+            signal.signal(signal.SIGHUP, self._on_reload)
+
+        APIlog.log(f"Supervisor {os.getpid()} starting {self._workers_count} worker(s)")
+        for _ in range(self._workers_count):
+            self._spawn()
+
+        try:
+            while self._workers:
+                if self._stopping:
+                    self._terminate_all()
+                    break
+                if self._reloading:
+                    self._reload()
+                self._reap()
+                time.sleep(POLL_INTERVAL)
+        finally:
+            if self._socket is not None:
+                self._socket.close()
+
+        APIlog.log("Supervisor stopped")
+
+    def _prepare_listener(self) -> bool:
+        if self._cfg.fileno is not None:
+            return True
+
+        reuse_port = hasattr(socket, 'SO_REUSEPORT')
+        self._cfg.reuse_port = reuse_port
+        try:
+            sock = self._server._create_socket()
+            if not reuse_port:
+                sock.listen(self._cfg.queue)
+        except (OSError, ValueError, InvalidIPversionError, InvalidProtocolError) as e:
+            APIlog.error(f"Error binding to {self._cfg.host}:{self._cfg.port}: {e}")
+            return False
+
+        if reuse_port:
+            # only a bind check; every worker binds its own socket
+            sock.close()
+            return True
+
+        self._socket = sock
+        self._cfg.fileno = sock.fileno()
+        return True
+
+    def _spawn(self):
+        sys.stdout.flush()
+        pid = os.fork()
+        if pid:
+            self._workers[pid] = time.monotonic()
+            return
+
+        code = 0
+        try:
+            signal.signal(signal.SIGTERM, signal.SIG_DFL)
+            signal.signal(signal.SIGINT, signal.SIG_DFL)
+            if hasattr(signal, 'SIGHUP'):
+                signal.signal(signal.SIGHUP, signal.SIG_DFL)
+            if asyncio.run(self._server._run_worker()) is False:
+                code = BIND_FAILED_EXIT
+        except BaseException as e:
+            APIlog.error(f"Worker {os.getpid()} crashed: {e}")
+            code = 1
+        finally:
+            APIlog.shutdown()
+            sys.stdout.flush()
+            os._exit(code)
+
+    def _reap(self):
+        while True:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                return
+            if not pid:
+                return
+
+            started = self._workers.pop(pid, None)
+            if pid in self._retiring:
+                self._retiring.discard(pid)
+                continue
+            if started is None or self._stopping:
+                continue
+
+            code = os.waitstatus_to_exitcode(status)
+            if code == BIND_FAILED_EXIT:
+                APIlog.error(f"Worker {pid} could not bind to {self._cfg.host}:{self._cfg.port}, stopping")
+                self._stopping = True
+                return
+
+            now = time.monotonic()
+            restarts = self._restarts
+            restarts.append(now)
+            while restarts[0] < now - RESTART_WINDOW:
+                restarts.popleft()
+            if len(restarts) > MAX_RESTARTS * self._workers_count:
+                APIlog.error(f"Workers restarted {len(restarts)} times in {RESTART_WINDOW:g}s, stopping")
+                self._stopping = True
+                return
+
+            APIlog.error(f"Worker {pid} exited with status {code}, restarting")
+            if now - started < RESTART_DELAY:
+                time.sleep(RESTART_DELAY)
+            self._spawn()
+
+    def _reload(self):
+        self._reloading = False
+        old_workers = [pid for pid in self._workers if pid not in self._retiring]
+        APIlog.log(f"Reloading {len(old_workers)} worker(s)")
+
+        for _ in range(self._workers_count):
+            self._spawn()
+        for pid in old_workers:
+            self._retiring.add(pid)
+            self._signal(pid, signal.SIGTERM)
+
+    def _terminate_all(self):
+        for pid in self._workers:
+            self._signal(pid, signal.SIGTERM)
+
+        deadline = time.monotonic() + self._cfg.graceful_timeout + 5
+        while self._workers and time.monotonic() < deadline:
+            self._reap()
+            time.sleep(POLL_INTERVAL)
+
+        for pid in list(self._workers):
+            self._signal(pid, signal.SIGKILL)
+            try:
+                os.waitpid(pid, 0)
+            except ChildProcessError:
+                pass
+            self._workers.pop(pid, None)
+
+    def _signal(self, pid: int, sig: int):
+        try:
+            os.kill(pid, sig)
+        except ProcessLookupError:
+            pass
+
+    def _on_stop(self, signum, frame):
+        self._stopping = True
+
+    def _on_reload(self, signum, frame):
+        self._reloading = True
@@ -1,5 +1,8 @@
-from WebRestAPI.template_string.template import Template
+from WebRestAPI.template_string.template import Template, TemplateLoader, compile_template, get_loader
 
 __all__ = [
     "Template",
+    "TemplateLoader",
+    "compile_template",
+    "get_loader",
 ]
\ No newline at end of file
@@ -1,19 +1,172 @@
+import asyncio
+import os
+import re
+from collections import OrderedDict
+from typing import Any, Dict, Mapping, Optional, Union
+
+from WebRestAPI.files.files import TemplateFilePath
+from WebRestAPI.log.log import APIlog
+
+CACHE_SIZE = 256
+
+_compiled: OrderedDict[tuple[str, str], tuple[list[str], tuple]] = OrderedDict()
+_patterns: Dict[str, re.Pattern] = {}
+_key_patterns: OrderedDict[tuple, re.Pattern] = OrderedDict()
+
+
+def _pattern(symbol: str) -> re.Pattern:
+    pattern = _patterns.get(symbol)
+    if pattern is None:
+        escaped = re.escape(symbol)
+        pattern = re.compile(rf"{escaped}(?:\{{([A-Za-z_][A-Za-z0-9_]*)\}}|([A-Za-z_][A-Za-z0-9_]*))")
+        _patterns[symbol] = pattern
+    return pattern
+
+
+def _key_pattern(symbol: str, keys: tuple[str, ...]) -> re.Pattern:
+    # connect() replaces "$key" wherever it appears, so "$priceUSD" with key "price" gives "5USD";
+    # longer keys are tried first so "$price_total" is not consumed by "$price"
+    key = (symbol, keys)
+    pattern = _key_patterns.get(key)
+    if pattern is None:
+        names = sorted(keys, key=len, reverse=True)
+        pattern = re.compile('|'.join(re.escape(symbol + name) for name in names))
+        _key_patterns[key] = pattern
+        if len(_key_patterns) > CACHE_SIZE:
+            _key_patterns.popitem(last=False)
+    else:
+        _key_patterns.move_to_end(key)
+    return pattern
+
+
+def compile_template(source: str, symbol: str = "$") -> tuple[list[str], tuple]:
+    key = (source, symbol)
+    compiled = _compiled.get(key)
+    if compiled is not None:
+        _compiled.move_to_end(key)
+        return compiled
+
+    # placeholders keep their raw text so names that are not supplied render unchanged
+    parts = []
+    slots = []
+    position = 0
+    for match in _pattern(symbol).finditer(source):
+        if match.start() > position:
+            parts.append(source[position:match.start()])
+        slots.append((len(parts), match.group(1) or match.group(2)))
+        parts.append(match.group(0))
+        position = match.end()
+    if position < len(source):
+        parts.append(source[position:])
+
+    compiled = (parts, tuple(slots))
+    _compiled[key] = compiled
+    if len(_compiled) > CACHE_SIZE:
+        _compiled.popitem(last=False)
+    return compiled
+
+
 class Template:
     def __init__(self,template: str, symbol: str = "$"):
         self.template: str = template
         self.symbol: str = symbol
+        self._parts, self._slots = compile_template(template, symbol)
+
+    @property
+    def names(self) -> tuple[str, ...]:
+        return tuple(dict.fromkeys(name for _, name in self._slots))
+
+    def render(self, variable: Optional[Mapping[str, Any]] = None, **kwargs) -> str:
+        if kwargs:
+            variable = {**variable, **kwargs} if variable else kwargs
+        if not self._slots:
+            return self.template
+        parts = self._parts.copy()
+        if variable:
+            for index, name in self._slots:
+                if name in variable:
+                    parts[index] = str(variable[name])
+        return ''.join(parts)
 
     def connect(self, variable: dict[str , str | int | float | bool | dict | list ]) -> str | None:
         try:
-            for key , value in variable.items():
-                self.template = self.template.replace(self.symbol + key , str(value))
-            return self.template
+            keys = tuple(key for key in variable if key)
+            if not keys:
+                return self.template
+            values = {self.symbol + key: str(variable[key]) for key in keys}
+            return _key_pattern(self.symbol, keys).sub(lambda match: values[match.group(0)], self.template)
         except Exception as e:
-            print(e)
+            APIlog.error(f"Template render error: {e}")
 
     def __str__(self):
         return self.template
 
 
+class TemplateLoader:
+    def __init__(self, directory: Union[TemplateFilePath, str, None] = None, symbol: str = "$",
+                 cache_size: int = CACHE_SIZE):
+        if directory is None:
+            directory = TemplateFilePath()
+        self.directory = os.path.realpath(str(directory))
+        self.symbol = symbol
+        self.cache_size = cache_size
+        self._templates: OrderedDict[str, tuple[int, int, Template]] = OrderedDict()
+
+    def resolve(self, name: str) -> str:
+        path = os.path.realpath(os.path.join(self.directory, name))
+        if os.path.commonpath((self.directory, path)) != self.directory:
+            raise ValueError(f"Template '{name}' is outside {self.directory}")
+        return path
+
+    def _cached(self, path: str) -> tuple[Optional[Template], os.stat_result]:
+        file_stat = os.stat(path)
+        entry = self._templates.get(path)
+        if entry is not None and entry[0] == file_stat.st_mtime_ns and entry[1] == file_stat.st_size:
+            self._templates.move_to_end(path)
+            return entry[2], file_stat
+        return None, file_stat
+
+    def _store(self, path: str, file_stat: os.stat_result, source: str) -> Template:
+        template = Template(source, self.symbol)
+        self._templates[path] = (file_stat.st_mtime_ns, file_stat.st_size, template)
+        self._templates.move_to_end(path)
+        if len(self._templates) > self.cache_size:
+            self._templates.popitem(last=False)
+        return template
+
+    def get(self, name: str) -> Template:
+        path = self.resolve(name)
+        template, file_stat = self._cached(path)
+        if template is None:
+            with open(path, encoding='utf-8') as file:
+                template = self._store(path, file_stat, file.read())
+        return template
+
+    async def load(self, name: str) -> Template:
+        path = self.resolve(name)
+        template, file_stat = self._cached(path)
+        if template is None:
+            def read():
+                with open(path, encoding='utf-8') as file:
+                    return file.read()
+            source = await asyncio.get_running_loop().run_in_executor(None, read)
+            template = self._store(path, file_stat, source)
+        return template
+
+    async def render(self, name: str, variable: Optional[Mapping[str, Any]] = None, **kwargs) -> str:
+        return (await self.load(name)).render(variable, **kwargs)
+
+    def clear(self):
+        self._templates.clear()
+
+
+_loaders: Dict[tuple[str, str], TemplateLoader] = {}
 
 
+def get_loader(directory: Union[TemplateFilePath, str, None] = None, symbol: str = "$") -> TemplateLoader:
+    key = (str(directory) if directory is not None else None, symbol)
+    loader = _loaders.get(key)
+    if loader is None:
+        loader = TemplateLoader(directory, symbol)
+        _loaders[key] = loader
+    return loader
@@ -0,0 +1,99 @@
+import argparse
+import asyncio
+import json
+import platform
+import subprocess
+import sys
+import time
+
+import WebRestAPI
+from benchmarks import micro
+from benchmarks.load import LoadGenerator, start_server
+
+
+def _commit() -> str | None:
+    try:
+        result = subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True, timeout=5)
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return result.stdout.strip() or None
+
+
+def _metadata() -> dict:
+    return {
+        "commit": _commit(),
+        "version": WebRestAPI.__version__,
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "timestamp": int(time.time()),
+    }
+
+
+def _run_micro(args) -> dict:
+    return {"micro": micro.run(args.group, args.min_time)}
+
+
+def _run_load(args) -> dict:
+    server = None
+    if not args.external:
+        server = start_server(args.host, args.port, args.workers, compression=args.compression)
+    try:
+        results = []
+        for path in args.path:
+            generator = LoadGenerator(args.host, args.port, path, args.concurrency, args.requests,
+                                      args.duration, not args.no_keep_alive, args.warmup)
+            results.append(asyncio.run(generator.run()))
+    finally:
+        if server is not None:
+            server.terminate()
+            server.join(5)
+    return {"load": results}
+
+
+def main(argv=None) -> int:
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("--output", "-o", help="write the JSON report to this file instead of stdout")
+
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description="WebRestAPI benchmarks")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    micro_parser = commands.add_parser("micro", parents=[common],
+                                       help="micro-benchmarks of the request hot paths")
+    micro_parser.add_argument("--group", action="append", choices=sorted(micro.GROUPS),
+                              help="run only this group; may be repeated")
+    micro_parser.add_argument("--min-time", type=float, default=micro.MIN_TIME,
+                              help="minimum seconds per measurement round")
+    micro_parser.set_defaults(run=_run_micro)
+
+    load_parser = commands.add_parser("load", parents=[common], help="drive a server over loopback")
+    load_parser.add_argument("--host", default="127.0.0.1")
+    load_parser.add_argument("--port", type=int, default=8765)
+    load_parser.add_argument("--path", action="append", help="request path; may be repeated (default /)")
+    load_parser.add_argument("--concurrency", "-c", type=int, default=64)
+    load_parser.add_argument("--requests", "-n", type=int, default=10000)
+    load_parser.add_argument("--duration", "-d", type=float, help="run for this many seconds instead of -n requests")
+    load_parser.add_argument("--warmup", type=int, default=200, help="unrecorded requests sent first")
+    load_parser.add_argument("--no-keep-alive", action="store_true", help="open a connection per request")
+    load_parser.add_argument("--workers", type=int, default=1, help="server worker processes")
+    load_parser.add_argument("--compression", action="store_true", help="enable response compression")
+    load_parser.add_argument("--external", action="store_true",
+                             help="benchmark an already running server instead of starting the bundled app")
+    load_parser.set_defaults(run=_run_load)
+
+    args = parser.parse_args(argv)
+    if args.command == "load" and not args.path:
+        args.path = ["/"]
+
+    report = {"meta": _metadata(), **args.run(args)}
+    data = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as file:
+            file.write(data + "\n")
+    else:
+        print(data)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
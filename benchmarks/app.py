@@ -0,0 +1,40 @@
+from WebRestAPI import APIConfiguration, APIServer, Router
+
+STATIC_ROUTES = 300
+PARAM_ROUTES = 300
+
+
+def build_router(static_routes: int = STATIC_ROUTES, param_routes: int = PARAM_ROUTES) -> Router:
+    router = Router()
+
+    @router.get("/")
+    async def index():
+        return {"message": "hello"}
+
+    @router.get("/plain")
+    async def plain():
+        return "hello"
+
+    @router.get("/users/{user_id:int}")
+    async def user(user_id: int, q: str = ""):
+        return {"user_id": user_id, "q": q}
+
+    async def item(item_id: int, name: str):
+        return {"item_id": item_id, "name": name}
+
+    @router.post("/echo")
+    async def echo(request):
+        return {"json": request.json_body}
+
+    for index in range(static_routes):
+        router.get(f"/static/{index}/items")(plain)
+    for index in range(param_routes):
+        router.get(f"/param/{index}/{{item_id:int}}/{{name}}")(item)
+    return router
+
+
+def build_server(host: str = "127.0.0.1", port: int = 8000, **options) -> APIServer:
+    options.setdefault("log_level", "error")
+    cfg = APIConfiguration(host=host, port=port, routes=[], **options)
+    cfg.include_router(build_router())
+    return APIServer(cfg)
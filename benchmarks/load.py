@@ -0,0 +1,150 @@
+import asyncio
+import math
+import multiprocessing
+import time
+from typing import Dict, List, Optional
+
+from benchmarks.app import build_server
+
+STARTUP_TIMEOUT = 10
+
+
+def percentile(values: List[float], fraction: float) -> float:
+    if not values:
+        return 0.0
+    index = max(0, math.ceil(fraction * len(values)) - 1)
+    return values[min(index, len(values) - 1)]
+
+
+def _serve(host: str, port: int, workers: int, options: dict):
+    build_server(host, port, **options).serve(workers)
+
+
+def start_server(host: str, port: int, workers: int = 1, **options) -> multiprocessing.Process:
+    process = multiprocessing.Process(target=_serve, args=(host, port, workers, options), daemon=True)
+    process.start()
+    return process
+
+
+async def wait_for_server(host: str, port: int, timeout: float = STARTUP_TIMEOUT):
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            _, writer = await asyncio.open_connection(host, port)
+        except OSError:
+            if time.monotonic() > deadline:
+                raise
+            await asyncio.sleep(0.05)
+            continue
+        writer.close()
+        return
+
+
+async def _read_response(reader: asyncio.StreamReader) -> tuple[int, bool]:
+    head = await reader.readuntil(b"\r\n\r\n")
+    lines = head.split(b"\r\n")
+    status = int(lines[0].split(b" ", 2)[1])
+    length = 0
+    keep_alive = True
+    for line in lines[1:]:
+        name, _, value = line.partition(b":")
+        name = name.strip().lower()
+        if name == b"content-length":
+            length = int(value)
+        elif name == b"connection":
+            keep_alive = value.strip().lower() != b"close"
+    if length:
+        await reader.readexactly(length)
+    return status, keep_alive
+
+
+class LoadGenerator:
+    def __init__(self, host: str = "127.0.0.1", port: int = 8000, path: str = "/",
+                 concurrency: int = 64, requests: Optional[int] = 10000, duration: Optional[float] = None,
+                 keep_alive: bool = True, warmup: int = 100):
+        self.host = host
+        self.port = port
+        self.path = path
+        self.concurrency = concurrency
+        self.requests = requests
+        self.duration = duration
+        self.keep_alive = keep_alive
+        self.warmup = warmup
+        connection = b"keep-alive" if keep_alive else b"close"
+        self._request = (
+            f"GET {path} HTTP/1.1\r\nHost: {host}:{port}\r\n".encode("latin-1")
+            + b"Connection: " + connection + b"\r\n\r\n"
+        )
+        self._latencies: List[float] = []
+        self._statuses: Dict[int, int] = {}
+        self._errors = 0
+        self._issued = 0
+        self._deadline = None
+
+    def _next(self) -> bool:
+        if self._deadline is not None:
+            return time.perf_counter() < self._deadline
+        if self._issued >= self.requests:
+            return False
+        self._issued += 1
+        return True
+
+    async def _worker(self, record: bool):
+        reader = writer = None
+        try:
+            while self._next():
+                if writer is None:
+                    reader, writer = await asyncio.open_connection(self.host, self.port)
+                started = time.perf_counter()
+                try:
+                    writer.write(self._request)
+                    status, keep_alive = await _read_response(reader)
+                except (OSError, asyncio.IncompleteReadError, ValueError):
+                    self._errors += 1
+                    writer.close()
+                    writer = None
+                    continue
+                if record:
+                    self._latencies.append(time.perf_counter() - started)
+                    self._statuses[status] = self._statuses.get(status, 0) + 1
+                if not (keep_alive and self.keep_alive):
+                    writer.close()
+                    writer = None
+        finally:
+            if writer is not None:
+                writer.close()
+
+    async def _round(self, requests: Optional[int], duration: Optional[float], record: bool) -> float:
+        self.requests = requests
+        self._issued = 0
+        started = time.perf_counter()
+        self._deadline = started + duration if duration else None
+        await asyncio.gather(*(self._worker(record) for _ in range(self.concurrency)))
+        return time.perf_counter() - started
+
+    async def run(self) -> dict:
+        await wait_for_server(self.host, self.port)
+        total = self.requests
+        if self.warmup:
+            await self._round(self.warmup, None, False)
+        elapsed = await self._round(total, self.duration, True)
+
+        latencies = sorted(self._latencies)
+        completed = len(latencies)
+        return {
+            "path": self.path,
+            "concurrency": self.concurrency,
+            "keep_alive": self.keep_alive,
+            "requests": completed,
+            "errors": self._errors,
+            "statuses": {str(status): count for status, count in sorted(self._statuses.items())},
+            "duration_s": round(elapsed, 4),
+            "requests_per_s": round(completed / elapsed, 1) if elapsed else 0.0,
+            "latency_ms": {
+                "mean": round(sum(latencies) / completed * 1000, 4) if completed else 0.0,
+                "p50": round(percentile(latencies, 0.50) * 1000, 4),
+                "p99": round(percentile(latencies, 0.99) * 1000, 4),
+                "p999": round(percentile(latencies, 0.999) * 1000, 4),
+                "max": round(latencies[-1] * 1000, 4) if completed else 0.0,
+            },
+        }
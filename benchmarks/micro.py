@@ -0,0 +1,136 @@
+import time
+from typing import Callable, Dict, List
+
+from WebRestAPI.parser import HTTPParser
+from WebRestAPI.requests import HTTPRequest
+from WebRestAPI.response import HTTPResponse, PrebuiltResponse
+from benchmarks.app import build_server
+
+MIN_TIME = 0.2
+
+GET_REQUEST = (
+    b"GET /users/42?q=search HTTP/1.1\r\n"
+    b"Host: localhost:8000\r\n"
+    b"User-Agent: benchmark/1.0\r\n"
+    b"Accept: application/json\r\n"
+    b"Accept-Encoding: gzip, deflate, br\r\n"
+    b"Connection: keep-alive\r\n\r\n"
+)
+POST_BODY = b'{"name": "benchmark", "values": [1, 2, 3, 4, 5], "nested": {"a": true}}'
+POST_REQUEST = (
+    b"POST /echo HTTP/1.1\r\n"
+    b"Host: localhost:8000\r\n"
+    b"Content-Type: application/json\r\n"
+    b"Content-Length: " + str(len(POST_BODY)).encode() + b"\r\n\r\n" + POST_BODY
+)
+CHUNKED_REQUEST = (
+    b"POST /echo HTTP/1.1\r\n"
+    b"Host: localhost:8000\r\n"
+    b"Transfer-Encoding: chunked\r\n\r\n"
+    + b"".join(b"%x\r\n%s\r\n" % (len(part), part) for part in (POST_BODY[:20], POST_BODY[20:40], POST_BODY[40:]))
+    + b"0\r\n\r\n"
+)
+JSON_CONTENT = {"id": 42, "name": "benchmark", "tags": ["a", "b", "c"], "active": True, "score": 12.5}
+
+
+def measure(func: Callable[[], object], min_time: float = MIN_TIME) -> Dict[str, float]:
+    loops = 1
+    while True:
+        started = time.perf_counter()
+        for _ in range(loops):
+            func()
+        elapsed = time.perf_counter() - started
+        if elapsed >= min_time:
+            break
+        loops *= 2 if elapsed < min_time / 10 else max(2, int(min_time / max(elapsed, 1e-9)))
+
+    # best of several rounds filters scheduler noise
+    best = elapsed
+    for _ in range(4):
+        started = time.perf_counter()
+        for _ in range(loops):
+            func()
+        best = min(best, time.perf_counter() - started)
+    return {"loops": loops, "ns_per_op": round(best / loops * 1e9, 1), "ops_per_sec": round(loops / best, 1)}
+
+
+def run_sync(coroutine):
+    # handlers that never suspend can be driven without an event loop
+    try:
+        coroutine.send(None)
+    except StopIteration as stop:
+        return stop.value
+    coroutine.close()
+    raise RuntimeError("Benchmark handler suspended")
+
+
+def parser_cases() -> Dict[str, Callable[[], object]]:
+    return {
+        "parser.get": lambda: HTTPParser().feed(GET_REQUEST),
+        "parser.post_json": lambda: HTTPParser().feed(POST_REQUEST),
+        "parser.chunked": lambda: HTTPParser().feed(CHUNKED_REQUEST),
+        "request.parse_get": lambda: HTTPRequest(GET_REQUEST).query_params,
+        "request.parse_json": lambda: HTTPRequest(POST_REQUEST).json_body,
+    }
+
+
+def routing_cases() -> Dict[str, Callable[[], object]]:
+    server = build_server()
+    server._prepare()
+    match = server._match_route
+    return {
+        "route.static_first": lambda: match("GET", "/static/0/items"),
+        "route.static_last": lambda: match("GET", "/static/299/items"),
+        "route.param_first": lambda: match("GET", "/param/0/17/name"),
+        "route.param_last": lambda: match("GET", "/param/299/17/name"),
+        "route.miss": lambda: match("GET", "/param/299/x/y/z"),
+        "route.method_not_allowed": lambda: match("POST", "/static/150/items"),
+    }
+
+
+def binding_cases() -> Dict[str, Callable[[], object]]:
+    server = build_server()
+    server._prepare()
+
+    def bind(target: str, raw: bytes):
+        route_info, path_params, _ = server._match_route("GET", target.partition('?')[0])
+        handler = route_info['handler']
+
+        def call():
+            request = HTTPRequest(raw)
+            request.path_params = path_params
+            return run_sync(handler(request))
+        return call
+
+    return {
+        "handler.no_params": bind("/", b"GET / HTTP/1.1\r\nHost: x\r\n\r\n"),
+        "handler.path_and_query": bind("/users/42", GET_REQUEST),
+        "handler.dispatch": lambda: run_sync(server._handle_request(HTTPRequest(GET_REQUEST))),
+    }
+
+
+def response_cases() -> Dict[str, Callable[[], object]]:
+    prebuilt = PrebuiltResponse(b'{"status":"ok"}', headers={'Content-Type': 'application/json'})
+    return {
+        "response.json": lambda: HTTPResponse.JSONResponse(JSON_CONTENT).build_buffers(True),
+        "response.html": lambda: HTTPResponse.HTMLResponse("<h1>hello</h1>").build_buffers(True),
+        "response.custom_headers": lambda: HTTPResponse.JSONResponse(
+            JSON_CONTENT, headers={'X-Request-Id': 'abc', 'Cache-Control': 'no-store'}).build_buffers(True),
+        "response.prebuilt": lambda: prebuilt.build_buffers(True),
+    }
+
+
+GROUPS = {
+    "parser": parser_cases,
+    "routing": routing_cases,
+    "binding": binding_cases,
+    "response": response_cases,
+}
+
+
+def run(groups: List[str] = None, min_time: float = MIN_TIME) -> Dict[str, Dict[str, float]]:
+    results = {}
+    for group in groups or GROUPS:
+        for name, case in GROUPS[group]().items():
+            results[name] = measure(case, min_time)
+    return results
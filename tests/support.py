@@ -0,0 +1,59 @@
+import asyncio
+import contextlib
+import unittest
+
+from WebRestAPI import APIServer, APIConfiguration
+
+
+def parse_response(data: bytes) -> tuple[int, dict, bytes]:
+    head, _, body = data.partition(b'\r\n\r\n')
+    lines = head.decode('latin-1').split('\r\n')
+    headers = {}
+    for line in lines[1:]:
+        name, _, value = line.partition(':')
+        headers[name.strip().lower()] = value.strip()
+    return int(lines[0].split()[1]), headers, body
+
+
+class ServerTestCase(unittest.IsolatedAsyncioTestCase):
+    config: dict = {}
+
+    def routers(self) -> list:
+        return []
+
+    async def asyncSetUp(self):
+        cfg = APIConfiguration(host='127.0.0.1', port=0, routes=[], log_level='error', **self.config)
+        for router in self.routers():
+            cfg.include_router(router)
+        self.app = APIServer(cfg)
+        self.task = asyncio.create_task(self.app.run())
+        while self.app._socket is None or not self.app._running:
+            await asyncio.sleep(0.01)
+        self.port = self.app._socket.getsockname()[1]
+
+    async def asyncTearDown(self):
+        self.task.cancel()
+        with contextlib.suppress(BaseException):
+            await self.task
+
+    async def open(self) -> tuple[asyncio.StreamReader, asyncio.StreamWriter]:
+        return await asyncio.open_connection('127.0.0.1', self.port)
+
+    async def send(self, raw: bytes, timeout: float = 5) -> bytes:
+        reader, writer = await self.open()
+        writer.write(raw)
+        await writer.drain()
+        try:
+            return await asyncio.wait_for(reader.read(), timeout)
+        finally:
+            writer.close()
+
+    async def request(self, method: str, path: str, headers: dict = None,
+                      body: bytes = b'') -> tuple[int, dict, bytes]:
+        lines = [f"{method} {path} HTTP/1.1", "Host: test", "Connection: close"]
+        for name, value in (headers or {}).items():
+            lines.append(f"{name}: {value}")
+        if body:
+            lines.append(f"Content-Length: {len(body)}")
+        raw = ("\r\n".join(lines) + "\r\n\r\n").encode('latin-1') + body
+        return parse_response(await self.send(raw))
@@ -0,0 +1,118 @@
+import asyncio
+import hashlib
+import os
+import unittest
+
+from WebRestAPI import Router
+from tests.support import ServerTestCase, parse_response
+
+
+def chunked(data: bytes, size: int) -> bytes:
+    out = b''
+    for start in range(0, len(data), size):
+        piece = data[start:start + size]
+        out += b'%x\r\n' % len(piece) + piece + b'\r\n'
+    return out + b'0\r\n\r\n'
+
+
+class SlowUploadTest(ServerTestCase):
+    config = {'client_timeout': 1}
+
+    def routers(self):
+        router = Router()
+
+        @router.post('/upload')
+        async def upload(request):
+            return {'size': len(request.body)}
+
+        return [router]
+
+    async def test_steady_upload_outlives_client_timeout(self):
+        reader, writer = await self.open()
+        writer.write(b"POST /upload HTTP/1.1\r\nHost: test\r\nConnection: close\r\nContent-Length: 12\r\n\r\n")
+        for _ in range(6):
+            await asyncio.sleep(0.4)
+            writer.write(b'xx')
+            await writer.drain()
+        status, _, body = parse_response(await asyncio.wait_for(reader.read(), 5))
+        writer.close()
+        self.assertEqual(status, 200)
+        self.assertEqual(body, b'{"size":12}')
+
+    async def test_stalled_upload_is_closed(self):
+        reader, writer = await self.open()
+        writer.write(b"POST /upload HTTP/1.1\r\nHost: test\r\nContent-Length: 12\r\n\r\nxx")
+        await writer.drain()
+        self.assertEqual(await asyncio.wait_for(reader.read(), 3), b'')
+        writer.close()
+
+
+class StreamedBodyTest(ServerTestCase):
+    config = {'max_body_size': 1024 * 1024}
+
+    def routers(self):
+        router = Router()
+
+        @router.post('/hash', stream=True)
+        async def digest(request):
+            sha = hashlib.sha256()
+            async for chunk in request.stream():
+                sha.update(chunk)
+            return {'sha': sha.hexdigest()}
+
+        return [router]
+
+    async def test_chunked_body_is_streamed(self):
+        data = os.urandom(300000)
+        raw = b"POST /hash HTTP/1.1\r\nHost: test\r\nConnection: close\r\nTransfer-Encoding: chunked\r\n\r\n"
+        status, _, body = parse_response(await self.send(raw + chunked(data, 70000)))
+        self.assertEqual(status, 200)
+        self.assertIn(hashlib.sha256(data).hexdigest().encode(), body)
+
+    async def test_oversized_stream_gets_413_and_close(self):
+        raw = b"POST /hash HTTP/1.1\r\nHost: test\r\nContent-Length: 2000000\r\n\r\n" + b'x' * 2000000
+        status, headers, _ = parse_response(await self.send(raw))
+        self.assertEqual(status, 413)
+        self.assertEqual(headers['connection'], 'close')
+
+
+class MultipartTest(ServerTestCase):
+    config = {'multipart_spool_size': 1024}
+
+    def routers(self):
+        router = Router()
+
+        @router.post('/form')
+        async def form(request):
+            upload = request.files['file']
+            content = b''.join([chunk async for chunk in upload.chunks()])
+            return {
+                'title': request.form_data['title'],
+                'size': upload.size,
+                'in_memory': upload.in_memory,
+                'sha': hashlib.sha256(content).hexdigest(),
+            }
+
+        return [router]
+
+    async def test_large_part_is_spooled_to_disk(self):
+        data = os.urandom(200000)
+        boundary = b'testboundary'
+        body = (
+            b'--' + boundary + b'\r\nContent-Disposition: form-data; name="title"\r\n\r\nhello\r\n'
+            b'--' + boundary + b'\r\nContent-Disposition: form-data; name="file"; filename="a.bin"\r\n'
+            b'Content-Type: application/octet-stream\r\n\r\n' + data + b'\r\n'
+            b'--' + boundary + b'--\r\n'
+        )
+        status, _, response = await self.request(
+            'POST', '/form', {'Content-Type': 'multipart/form-data; boundary=testboundary'}, body
+        )
+        self.assertEqual(status, 200)
+        self.assertIn(b'"title":"hello"', response)
+        self.assertIn(b'"size":200000', response)
+        self.assertIn(b'"in_memory":false', response)
+        self.assertIn(hashlib.sha256(data).hexdigest().encode(), response)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,64 @@
+import asyncio
+import unittest
+
+from WebRestAPI import Router, CachePolicy
+from tests.support import ServerTestCase
+
+
+class ResponseCacheTest(ServerTestCase):
+    def routers(self):
+        self.calls = 0
+        router = Router()
+
+        @router.get('/slow', cache=CachePolicy(ttl=5))
+        async def slow(request):
+            self.calls += 1
+            await asyncio.sleep(0.3)
+            return {'calls': self.calls}
+
+        @router.get('/short', cache=CachePolicy(ttl=0.1))
+        async def short(request):
+            self.calls += 1
+            return {'calls': self.calls}
+
+        return [router]
+
+    def stats(self, path: str) -> dict:
+        return self.app.cache_stats()[f"GET {path}"]
+
+    async def test_concurrent_misses_run_handler_once(self):
+        results = await asyncio.gather(*(self.request('GET', '/slow') for _ in range(10)))
+        self.assertEqual({body for _, _, body in results}, {b'{"calls":1}'})
+        self.assertEqual(self.calls, 1)
+        stats = self.stats('/slow')
+        self.assertEqual(stats['misses'], 1)
+        self.assertEqual(stats['coalesced'], 9)
+
+        await self.request('GET', '/slow')
+        self.assertEqual(self.stats('/slow')['hits'], 1)
+
+    async def test_follower_answered_when_leader_disconnects(self):
+        reader, writer = await self.open()
+        writer.write(b"GET /slow HTTP/1.1\r\nHost: test\r\n\r\n")
+        await writer.drain()
+        await asyncio.sleep(0.1)
+        follower = asyncio.ensure_future(self.request('GET', '/slow'))
+        await asyncio.sleep(0.05)
+        writer.transport.abort()
+
+        status, _, body = await asyncio.wait_for(follower, 3)
+        self.assertEqual(status, 200)
+        self.assertEqual(body, b'{"calls":1}')
+
+    async def test_no_cache_and_expiry(self):
+        await self.request('GET', '/short')
+        status, _, body = await self.request('GET', '/short', {'Cache-Control': 'no-cache'})
+        self.assertEqual(body, b'{"calls":2}')
+        await asyncio.sleep(0.15)
+        status, _, body = await self.request('GET', '/short')
+        self.assertEqual(body, b'{"calls":3}')
+        self.assertEqual(self.stats('/short')['expirations'], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
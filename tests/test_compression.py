@@ -0,0 +1,58 @@
+import gzip
+import unittest
+
+from WebRestAPI import Router, HTTPResponse
+from tests.support import ServerTestCase
+
+TEXT = "compressible text " * 200
+SHARED = HTTPResponse.PlainTextResponse(TEXT)
+
+
+class CompressionTest(ServerTestCase):
+    config = {'compression': True}
+
+    def routers(self):
+        router = Router()
+
+        @router.get('/text')
+        async def text(request):
+            return HTTPResponse.PlainTextResponse(TEXT)
+
+        @router.get('/shared')
+        async def shared(request):
+            return SHARED
+
+        @router.get('/small')
+        async def small(request):
+            return {'ok': True}
+
+        return [router]
+
+    async def test_gzip_when_accepted(self):
+        status, headers, body = await self.request('GET', '/text', {'Accept-Encoding': 'gzip'})
+        self.assertEqual(status, 200)
+        self.assertEqual(headers['content-encoding'], 'gzip')
+        self.assertEqual(headers['vary'], 'Accept-Encoding')
+        self.assertEqual(gzip.decompress(body).decode(), TEXT)
+
+    async def test_identity_without_accept_encoding(self):
+        status, headers, body = await self.request('GET', '/text')
+        self.assertNotIn('content-encoding', headers)
+        self.assertEqual(body.decode(), TEXT)
+
+    async def test_small_body_is_not_compressed(self):
+        status, headers, body = await self.request('GET', '/small', {'Accept-Encoding': 'gzip'})
+        self.assertNotIn('content-encoding', headers)
+        self.assertEqual(body, b'{"ok":true}')
+
+    async def test_shared_response_is_not_modified(self):
+        await self.request('GET', '/shared', {'Accept-Encoding': 'gzip'})
+        status, headers, body = await self.request('GET', '/shared')
+        self.assertNotIn('content-encoding', headers)
+        self.assertEqual(body.decode(), TEXT)
+        self.assertNotIn('Content-Encoding', SHARED.headers)
+        self.assertEqual(SHARED.content, TEXT)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,94 @@
+import gzip
+import os
+import shutil
+import tempfile
+import unittest
+
+from WebRestAPI import Router, FileStreamResponse
+from tests.support import ServerTestCase
+
+CONTENT = b"0123456789" * 100
+
+
+class FileResponseTest(ServerTestCase):
+    def routers(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+        with open(os.path.join(self.directory, 'data.txt'), 'wb') as file:
+            file.write(CONTENT)
+        with open(os.path.join(self.directory, 'page.html'), 'wb') as file:
+            file.write(b'<p>plain</p>')
+        with open(os.path.join(self.directory, 'page.html.gz'), 'wb') as file:
+            file.write(gzip.compress(b'<p>plain</p>'))
+
+        router = Router()
+
+        @router.get('/download')
+        async def download(request):
+            return FileStreamResponse(os.path.join(self.directory, 'data.txt'))
+
+        self.static = router.mount_static('/static', self.directory)
+        return [router]
+
+    async def test_full_file(self):
+        status, headers, body = await self.request('GET', '/download')
+        self.assertEqual(status, 200)
+        self.assertEqual(headers['accept-ranges'], 'bytes')
+        self.assertEqual(body, CONTENT)
+
+    async def test_range(self):
+        status, headers, body = await self.request('GET', '/download', {'Range': 'bytes=10-19'})
+        self.assertEqual(status, 206)
+        self.assertEqual(headers['content-range'], f'bytes 10-19/{len(CONTENT)}')
+        self.assertEqual(body, CONTENT[10:20])
+
+        status, headers, body = await self.request('GET', '/download', {'Range': 'bytes=-5'})
+        self.assertEqual(status, 206)
+        self.assertEqual(body, CONTENT[-5:])
+
+    async def test_unsatisfiable_range(self):
+        status, headers, _ = await self.request('GET', '/download', {'Range': f'bytes={len(CONTENT)}-'})
+        self.assertEqual(status, 416)
+        self.assertEqual(headers['content-range'], f'bytes */{len(CONTENT)}')
+
+    async def test_not_modified(self):
+        _, headers, _ = await self.request('GET', '/download')
+        status, _, body = await self.request('GET', '/download', {'If-None-Match': headers['etag']})
+        self.assertEqual(status, 304)
+        self.assertEqual(body, b'')
+
+    async def test_static_file_and_cache(self):
+        for _ in range(2):
+            status, headers, body = await self.request('GET', '/static/data.txt')
+            self.assertEqual(status, 200)
+            self.assertEqual(headers['content-type'], 'text/plain')
+            self.assertEqual(body, CONTENT)
+        self.assertEqual((self.static.cache.misses, self.static.cache.hits), (1, 1))
+
+    async def test_static_precompressed_variant(self):
+        status, headers, body = await self.request('GET', '/static/page.html', {'Accept-Encoding': 'gzip'})
+        self.assertEqual(status, 200)
+        self.assertEqual(headers['content-encoding'], 'gzip')
+        self.assertEqual(headers['content-type'], 'text/html')
+        self.assertEqual(gzip.decompress(body), b'<p>plain</p>')
+
+        status, headers, body = await self.request('GET', '/static/page.html')
+        self.assertNotIn('content-encoding', headers)
+        self.assertEqual(body, b'<p>plain</p>')
+
+    async def test_static_rejects_traversal_and_missing_files(self):
+        for path in ('/static/../etc/passwd', '/static/%2e%2e/secret', '/static/missing.txt', '/static/'):
+            status, _, _ = await self.request('GET', path)
+            self.assertEqual(status, 404, path)
+
+    async def test_static_head(self):
+        raw = (b"HEAD /static/data.txt HTTP/1.1\r\nHost: test\r\n\r\n"
+               b"GET /static/page.html HTTP/1.1\r\nHost: test\r\nConnection: close\r\n\r\n")
+        data = await self.send(raw)
+        self.assertEqual(data.count(b'HTTP/1.1 200'), 2)
+        self.assertNotIn(CONTENT, data)
+        self.assertTrue(data.endswith(b'<p>plain</p>'))
+
+
+if __name__ == '__main__':
+    unittest.main()
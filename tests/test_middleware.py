@@ -0,0 +1,67 @@
+import unittest
+
+from WebRestAPI import Router, HTTPResponse
+from tests.support import ServerTestCase
+
+
+async def request_id(request, call_next):
+    request.state.request_id = 'abc'
+    response = await call_next(request)
+    response.headers['X-Request-ID'] = request.state.request_id
+    return response
+
+
+async def require_token(request, call_next):
+    if request.headers.get('x-token') != 'ok':
+        return HTTPResponse.JSONResponse({'error': 'unauthorized'}, status_code=401)
+    return await call_next(request)
+
+
+class MiddlewareTest(ServerTestCase):
+    config = {'middleware': [request_id], 'metrics': True}
+
+    def routers(self):
+        router = Router('/private')
+        router.add_middleware(require_token)
+
+        @router.get('/data')
+        async def data(request):
+            return {'id': request.state.request_id}
+
+        return [router]
+
+    async def asyncSetUp(self):
+        await super().asyncSetUp()
+        self.app.assets.register('/health', content={'status': 'ok'}, cache_control=None)
+
+    async def test_route_middleware_order(self):
+        status, headers, _ = await self.request('GET', '/private/data')
+        self.assertEqual(status, 401)
+        self.assertEqual(headers['x-request-id'], 'abc')
+
+        status, headers, body = await self.request('GET', '/private/data', {'X-Token': 'ok'})
+        self.assertEqual(status, 200)
+        self.assertEqual(body, b'{"id":"abc"}')
+
+    async def test_global_middleware_sees_misses_and_assets(self):
+        status, headers, _ = await self.request('GET', '/missing')
+        self.assertEqual(status, 404)
+        self.assertEqual(headers['x-request-id'], 'abc')
+
+        for _ in range(2):
+            status, headers, body = await self.request('GET', '/health')
+            self.assertEqual(status, 200)
+            self.assertEqual(headers['x-request-id'], 'abc')
+            self.assertEqual(body, b'{"status":"ok"}')
+        self.assertNotIn('X-Request-ID', self.app.assets.get('/health').headers)
+
+    async def test_metrics_endpoint(self):
+        await self.request('GET', '/private/data', {'X-Token': 'ok'})
+        status, headers, body = await self.request('GET', '/metrics')
+        self.assertEqual(status, 200)
+        self.assertTrue(headers['content-type'].startswith('text/plain'))
+        self.assertIn(b'webrestapi_requests_total{method="GET",route="/private/data",status="200"} 1', body)
+
+
+if __name__ == '__main__':
+    unittest.main()
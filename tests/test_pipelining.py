@@ -0,0 +1,56 @@
+import unittest
+
+from WebRestAPI import Router
+from WebRestAPI.parser import HTTPParser, ParserEvent
+from WebRestAPI.exception_code import HTTPParseError
+from tests.support import ServerTestCase
+
+PIPELINED = (
+    b"GET /u/1 HTTP/1.1\r\nHost: test\r\n\r\n"
+    b"GET /u/2 HTTP/1.1\r\nHost: test\r\n\r\n"
+    b"BAD\r\n\r\n"
+)
+
+
+class ParserErrorTest(unittest.TestCase):
+    def test_events_before_error_are_returned(self):
+        parser = HTTPParser()
+        events = parser.feed(PIPELINED)
+        kinds = [event for event, _ in events]
+        self.assertEqual(kinds.count(ParserEvent.COMPLETE), 2)
+        self.assertIs(kinds[-1], ParserEvent.ERROR)
+        self.assertIsInstance(events[-1][1], HTTPParseError)
+        self.assertEqual(events[-1][1].status_code, 400)
+
+    def test_input_after_error_is_ignored(self):
+        parser = HTTPParser()
+        parser.feed(b"BAD\r\n\r\n")
+        self.assertEqual(parser.feed(b"GET / HTTP/1.1\r\n\r\n"), [])
+
+
+class PipeliningTest(ServerTestCase):
+    def routers(self):
+        router = Router()
+
+        @router.get('/u/{user_id}')
+        async def user(request):
+            return {'id': request.path_params['user_id']}
+
+        return [router]
+
+    async def test_requests_before_malformed_one_are_answered(self):
+        data = await self.send(PIPELINED)
+        self.assertEqual(data.count(b'HTTP/1.1 200'), 2)
+        self.assertIn(b'"1"', data)
+        self.assertIn(b'"2"', data)
+        self.assertTrue(data.split(b'HTTP/1.1 ')[-1].startswith(b'400'))
+
+    async def test_responses_keep_request_order(self):
+        raw = b''.join(b"GET /u/%d HTTP/1.1\r\nHost: test\r\n\r\n" % number for number in range(5))
+        data = await self.send(raw + b"GET /u/last HTTP/1.1\r\nHost: test\r\nConnection: close\r\n\r\n")
+        positions = [data.index(b'"%d"' % number) for number in range(5)] + [data.index(b'"last"')]
+        self.assertEqual(positions, sorted(positions))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,81 @@
+import unittest
+
+from WebRestAPI import Router
+from tests.support import ServerTestCase, parse_response
+
+
+class RoutingTest(ServerTestCase):
+    def routers(self):
+        router = Router()
+
+        @router.get('/items/{item_id:int}')
+        async def item(item_id: int):
+            return {'id': item_id}
+
+        @router.post('/items')
+        async def create(request):
+            return {'created': True}
+
+        @router.get('/search')
+        async def search(q: str, limit: int = 10):
+            return {'q': q, 'limit': limit}
+
+        @router.get('/files/{rest:path}')
+        async def files(rest: str):
+            return {'rest': rest}
+
+        return [router]
+
+    async def test_path_params_are_converted(self):
+        status, _, body = await self.request('GET', '/items/42')
+        self.assertEqual(status, 200)
+        self.assertEqual(body, b'{"id":42}')
+
+    async def test_catch_all_route(self):
+        status, _, body = await self.request('GET', '/files/a/b/c.txt')
+        self.assertEqual(status, 200)
+        self.assertEqual(body, b'{"rest":"a/b/c.txt"}')
+
+    async def test_unknown_path_is_404(self):
+        status, _, _ = await self.request('GET', '/nope')
+        self.assertEqual(status, 404)
+
+    async def test_wrong_method_is_405_with_allow(self):
+        status, headers, _ = await self.request('DELETE', '/items/1')
+        self.assertEqual(status, 405)
+        self.assertEqual(headers['allow'], 'GET, HEAD')
+
+        status, headers, _ = await self.request('GET', '/items')
+        self.assertEqual(status, 405)
+        self.assertEqual(headers['allow'], 'POST')
+
+    async def test_head_uses_get_route_without_body(self):
+        raw = (b"HEAD /items/7 HTTP/1.1\r\nHost: test\r\n\r\n"
+               b"GET /items/8 HTTP/1.1\r\nHost: test\r\nConnection: close\r\n\r\n")
+        data = await self.send(raw)
+        status, headers, rest = parse_response(data)
+        self.assertEqual(status, 200)
+        self.assertEqual(headers['content-length'], '8')
+        status, _, body = parse_response(rest)
+        self.assertEqual(status, 200)
+        self.assertEqual(body, b'{"id":8}')
+
+    async def test_missing_query_param_is_422(self):
+        status, _, body = await self.request('GET', '/search')
+        self.assertEqual(status, 422)
+        self.assertIn(b'"field":"q"', body)
+        self.assertIn(b'field required', body)
+
+    async def test_invalid_query_param_is_422(self):
+        status, _, body = await self.request('GET', '/search?q=a&limit=x')
+        self.assertEqual(status, 422)
+        self.assertIn(b'"field":"limit"', body)
+
+    async def test_query_params_are_converted(self):
+        status, _, body = await self.request('GET', '/search?q=a&limit=5')
+        self.assertEqual(status, 200)
+        self.assertEqual(body, b'{"q":"a","limit":5}')
+
+
+if __name__ == '__main__':
+    unittest.main()
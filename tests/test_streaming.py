@@ -0,0 +1,51 @@
+import unittest
+
+from WebRestAPI import Router, StreamingResponse, EventSourceResponse, ServerSentEvent
+from tests.support import ServerTestCase, parse_response
+
+
+class StreamingResponseTest(ServerTestCase):
+    def routers(self):
+        self.started = []
+        router = Router()
+
+        async def numbers():
+            self.started.append(True)
+            for number in range(3):
+                yield f"{number}\n"
+
+        @router.get('/numbers')
+        async def stream(request):
+            return StreamingResponse(numbers(), media_type='text/plain')
+
+        @router.get('/events')
+        async def events(request):
+            return EventSourceResponse([ServerSentEvent({'n': 1}, event='tick', id='1'), 'done'])
+
+        return [router]
+
+    async def test_chunked_body(self):
+        status, headers, body = await self.request('GET', '/numbers')
+        self.assertEqual(status, 200)
+        self.assertEqual(headers['transfer-encoding'], 'chunked')
+        self.assertEqual(body, b'2\r\n0\n\r\n2\r\n1\n\r\n2\r\n2\n\r\n0\r\n\r\n')
+
+    async def test_head_sends_no_body(self):
+        raw = (b"HEAD /numbers HTTP/1.1\r\nHost: test\r\n\r\n"
+               b"GET /events HTTP/1.1\r\nHost: test\r\nConnection: close\r\n\r\n")
+        status, headers, rest = parse_response(await self.send(raw))
+        self.assertEqual(status, 200)
+        self.assertEqual(headers['transfer-encoding'], 'chunked')
+        self.assertTrue(rest.startswith(b'HTTP/1.1 200'))
+        self.assertEqual(self.started, [])
+
+    async def test_server_sent_events(self):
+        status, headers, body = await self.request('GET', '/events')
+        self.assertEqual(status, 200)
+        self.assertTrue(headers['content-type'].startswith('text/event-stream'))
+        self.assertIn(b'id: 1\nevent: tick\ndata: {"n":1}\n\n', body)
+        self.assertIn(b'data: done\n\n', body)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,62 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from WebRestAPI.template_string.template import Template, TemplateLoader
+
+
+class TemplateTest(unittest.TestCase):
+    def test_connect_replaces_key_prefixes(self):
+        self.assertEqual(Template('Total: $priceUSD').connect({'price': 5}), 'Total: 5USD')
+
+    def test_connect_accepts_any_key(self):
+        template = Template('Hi $user-name, $price_total / $price')
+        result = template.connect({'user-name': 'bob', 'price': 1, 'price_total': 9})
+        self.assertEqual(result, 'Hi bob, 9 / 1')
+
+    def test_connect_does_not_modify_template(self):
+        template = Template('x $a $b')
+        self.assertEqual(template.connect({'a': 1}), 'x 1 $b')
+        self.assertEqual(template.connect({'a': 2, 'b': 3}), 'x 2 3')
+        self.assertEqual(template.template, 'x $a $b')
+
+    def test_render_matches_whole_names(self):
+        template = Template('${price}USD $priceUSD $missing')
+        self.assertEqual(template.render(price=5), '5USD $priceUSD $missing')
+        self.assertEqual(template.names, ('price', 'priceUSD', 'missing'))
+
+    def test_custom_symbol(self):
+        self.assertEqual(Template('a #x b').render({'x': 1}), 'a #x b')
+        self.assertEqual(Template('a #x b', symbol='#').render({'x': 1}), 'a 1 b')
+
+
+class TemplateLoaderTest(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+        self.path = os.path.join(self.directory, 'page.html')
+        with open(self.path, 'w') as file:
+            file.write('<p>$name</p>')
+        self.loader = TemplateLoader(self.directory)
+
+    async def test_render_and_cache(self):
+        self.assertEqual(await self.loader.render('page.html', {'name': 'a'}), '<p>a</p>')
+        self.assertIs(await self.loader.load('page.html'), await self.loader.load('page.html'))
+
+    async def test_reloads_changed_file(self):
+        first = await self.loader.load('page.html')
+        with open(self.path, 'w') as file:
+            file.write('<div>$name</div>')
+        os.utime(self.path, ns=(0, os.stat(self.path).st_mtime_ns + 1_000_000))
+        second = await self.loader.load('page.html')
+        self.assertIsNot(first, second)
+        self.assertEqual(second.render(name='b'), '<div>b</div>')
+
+    async def test_rejects_paths_outside_directory(self):
+        with self.assertRaises(ValueError):
+            await self.loader.load('../page.html')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,48 @@
+import asyncio
+import os
+import tempfile
+import unittest
+
+from WebRestAPI import Router, FileStreamResponse
+from tests.support import ServerTestCase
+
+FILE_SIZE = 32 * 1024 * 1024
+
+
+class FileWriteTimeoutTest(ServerTestCase):
+    config = {'write_timeout': 1, 'write_buffer_high': 64 * 1024}
+
+    def routers(self):
+        handle, self.path = tempfile.mkstemp()
+        with os.fdopen(handle, 'wb') as file:
+            file.truncate(FILE_SIZE)
+        self.addCleanup(os.unlink, self.path)
+
+        router = Router()
+
+        @router.get('/big')
+        async def big(request):
+            return FileStreamResponse(self.path)
+
+        return [router]
+
+    async def test_stalled_reader_is_dropped(self):
+        reader, writer = await self.open()
+        writer.write(b"GET /big HTTP/1.1\r\nHost: test\r\n\r\n")
+        await writer.drain()
+        await asyncio.sleep(2.5)
+        self.assertEqual(len(self.app._connections), 0)
+        writer.close()
+
+    async def test_steady_reader_gets_whole_file(self):
+        reader, writer = await self.open()
+        writer.write(b"GET /big HTTP/1.1\r\nHost: test\r\nConnection: close\r\n\r\n")
+        await writer.drain()
+        data = await asyncio.wait_for(reader.read(), 10)
+        writer.close()
+        self.assertTrue(data.startswith(b'HTTP/1.1 200'))
+        self.assertEqual(len(data.partition(b'\r\n\r\n')[2]), FILE_SIZE)
+
+
+if __name__ == '__main__':
+    unittest.main()